@@ -1,12 +1,61 @@
+import math
+import os
 import random
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import NamedTuple
 
-def birthday_simulation(group_size=23, trials=1_000_000):
+import numpy as np
+
+from result_cache import ResultCache
+
+# Version of the simulation engines; bump it whenever their results change
+# so that cached results are recomputed.
+ENGINE_VERSION = 1
+
+# On-disk store of the sweeps run from the command line
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results_cache.sqlite")
+
+# In-process cache used by `birthday_curve_cached` when none is given
+_default_cache = None
+
+# Upper bound on the number of birthdays held in memory at once by the
+# vectorized engine (about 2 MB of uint16 values per chunk).
+CHUNK_ELEMENTS = 1 << 20
+
+# Group sizes up to this bound are answered exactly from the memoized
+# product table; larger ones switch to a closed form (or, with an explicit
+# method="exact", are computed without growing the table).
+EXACT_TABLE_LIMIT = 1_000_000
+
+# Number of distinct `days` whose product table is kept (least recently
+# used first out); a full table takes 8 MB.
+EXACT_TABLE_DAYS = 8
+
+METHODS = ("auto", "exact", "log", "approx", "montecarlo")
+
+# Largest group_size * days for which the non-uniform exact evaluator runs.
+EXACT_WEIGHTED_LIMIT = 10_000_000
+
+# Below this many days left over (d - n), the log method uses log-gamma
+# directly instead of Stirling's series.
+STIRLING_MIN_REST = 100
+
+# days -> array whose entry n is log P(n people share no birthday), in LRU order
+_NO_SHARED_LOG_PRODUCTS = OrderedDict()
+
+
+def birthday_simulation(group_size=23, trials=1_000_000, days=365):
     """
     Simulates the birthday problem for a given group size and number of trials.
 
     Args:
         group_size (int): The number of people in the group.
         trials (int): The number of times to run the simulation.
+        days (int): The number of equally likely birthdays.
 
     Returns:
         float: The probability of at least two people sharing a birthday.
@@ -16,7 +65,7 @@ def birthday_simulation(group_size=23, trials=1_000_000):
     # Run the simulation for the given number of trials
     for _ in range(trials):
         # Generate a list of random birthdays for the group
-        birthdays = [random.randint(1, 365) for _ in range(group_size)]
+        birthdays = [random.randint(1, days) for _ in range(group_size)]
         # Check if there are any duplicate birthdays in the list
         if len(birthdays) != len(set(birthdays)):
             # If there are duplicates, increment the counter
@@ -25,10 +74,545 @@ def birthday_simulation(group_size=23, trials=1_000_000):
     return same_birthday / trials
 
 
+def _draw_birthdays(rng, trials, group_size, days=365, weights=None):
+    """
+    Draws a (trials, group_size) matrix of birthdays numbered from 0.
+
+    Args:
+        rng (numpy.random.Generator): The random generator to draw birthdays from.
+        trials (int): The number of rows (trials) to draw.
+        group_size (int): The number of columns (people) to draw.
+        days (int): The number of possible birthdays.
+        weights (sequence of float, optional): Probability of each day.
+            Birthdays are uniform when omitted.
+
+    Returns:
+        numpy.ndarray: The matrix of birthdays, using the smallest fitting dtype.
+    """
+    if days <= 1 << 16:
+        dtype = np.uint16
+    elif days <= 1 << 32:
+        dtype = np.uint32
+    else:
+        dtype = np.uint64
+    if weights is None:
+        return rng.integers(0, days, size=(trials, group_size), dtype=dtype)
+    return rng.choice(days, size=(trials, group_size), p=weights).astype(dtype)
+
+
+def _count_shared(rng, group_size, trials, chunk_size=None, days=365, weights=None):
+    """
+    Counts the trials with at least one shared birthday using NumPy.
+
+    Args:
+        rng (numpy.random.Generator): The random generator to draw birthdays from.
+        group_size (int): The number of people in the group.
+        trials (int): The number of trials to run.
+        chunk_size (int, optional): The number of trials drawn per chunk.
+        days (int): The number of possible birthdays.
+        weights (sequence of float, optional): Probability of each day.
+
+    Returns:
+        int: The number of trials with a shared birthday.
+    """
+    if chunk_size is None:
+        # Keep each (chunk, group_size) matrix below CHUNK_ELEMENTS values
+        chunk_size = max(1, CHUNK_ELEMENTS // max(group_size, 1))
+    same_birthday = 0
+    remaining = trials
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        # Draw a whole matrix of birthdays: one row per trial
+        birthdays = _draw_birthdays(rng, n, group_size, days, weights)
+        same_birthday += int(np.count_nonzero(_has_shared(birthdays)))
+        remaining -= n
+    return same_birthday
+
+
+def _has_shared(birthdays):
+    """
+    Tells which rows of a birthday matrix contain a shared birthday.
+
+    Args:
+        birthdays (numpy.ndarray): A (trials, group_size) matrix of birthdays.
+            It is sorted in place.
+
+    Returns:
+        numpy.ndarray: One boolean per trial.
+    """
+    # After sorting each row, a shared birthday shows up as two equal neighbours
+    birthdays.sort(axis=1)
+    return (np.diff(birthdays, axis=1) == 0).any(axis=1)
+
+
+def birthday_simulation_vectorized(
+    group_size=23, trials=1_000_000, seed=None, chunk_size=None, days=365, weights=None
+):
+    """
+    Simulates the birthday problem with a batched NumPy engine.
+
+    Produces the same estimate as `birthday_simulation`, but draws the
+    birthdays of many trials at once and detects collisions with a
+    sort-and-diff over each row instead of a Python loop per trial.
+
+    Args:
+        group_size (int): The number of people in the group.
+        trials (int): The number of times to run the simulation.
+        seed (int, optional): Seed for the NumPy random generator.
+        chunk_size (int, optional): The number of trials processed per chunk.
+            Defaults to a size that keeps memory use bounded.
+        days (int): The number of possible birthdays.
+        weights (sequence of float, optional): Probability of each day.
+            Birthdays are uniform when omitted.
+
+    Returns:
+        float: The probability of at least two people sharing a birthday.
+    """
+    rng = np.random.default_rng(seed)
+    return _count_shared(rng, group_size, trials, chunk_size, days, weights) / trials
+
+
+def _count_shared_shard(seed_sequence, group_size, trials, chunk_size=None, days=365):
+    """
+    Worker entry point: counts shared birthdays for one shard of trials.
+
+    Args:
+        seed_sequence (numpy.random.SeedSequence): The child seed of this shard.
+        group_size (int): The number of people in the group.
+        trials (int): The number of trials in this shard.
+        chunk_size (int, optional): The number of trials processed per chunk.
+        days (int): The number of possible birthdays.
+
+    Returns:
+        int: The number of trials with a shared birthday.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    return _count_shared(rng, group_size, trials, chunk_size, days)
+
+
+def birthday_simulation_parallel(
+    group_size=23, trials=1_000_000, workers=None, seed=None, chunk_size=None, days=365
+):
+    """
+    Simulates the birthday problem across a pool of worker processes.
+
+    The trials are split into one shard per worker. Every shard gets an
+    independent child seed spawned from the master seed, and only the
+    collision counts travel back to the parent. For a given `seed` and
+    `workers` the result is deterministic.
+
+    Args:
+        group_size (int): The number of people in the group.
+        trials (int): The total number of times to run the simulation.
+        workers (int, optional): The number of processes. Defaults to the CPU count.
+        seed (int, optional): Master seed the shard seeds are spawned from.
+        chunk_size (int, optional): The number of trials processed per chunk in a worker.
+        days (int): The number of possible birthdays.
+
+    Returns:
+        float: The probability of at least two people sharing a birthday.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Spread the trials as evenly as possible over the shards
+    base, extra = divmod(trials, workers)
+    shard_trials = [base + (1 if i < extra else 0) for i in range(workers)]
+    child_seeds = np.random.SeedSequence(seed).spawn(workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        counts = pool.map(
+            _count_shared_shard,
+            child_seeds,
+            [group_size] * workers,
+            shard_trials,
+            [chunk_size] * workers,
+            [days] * workers,
+        )
+        same_birthday = sum(counts)
+    return same_birthday / trials
+
+
+def birthday_curve(max_group_size=100, trials=1_000_000, seed=None, chunk_size=None, days=365):
+    """
+    Estimates the shared-birthday probability for every group size at once.
+
+    Each trial draws `max_group_size` birthdays a single time and records
+    the index of the first person whose birthday was already taken. A
+    group of `n` people has a shared birthday exactly when that index is
+    below `n`, so a cumulative histogram of the indices gives the whole
+    probability curve from one pass.
+
+    Args:
+        max_group_size (int): The largest group size of the curve.
+        trials (int): The number of times to run the simulation.
+        seed (int, optional): Seed for the NumPy random generator.
+        chunk_size (int, optional): The number of trials processed per chunk.
+        days (int): The number of possible birthdays.
+
+    Returns:
+        numpy.ndarray: Array of length `max_group_size + 1` whose entry `n` is
+        the probability of a shared birthday in a group of `n` people.
+    """
+    rng = np.random.default_rng(seed)
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_ELEMENTS // max(max_group_size, 1))
+    # first_repeat[j] counts the trials whose first repeated birthday is person j;
+    # index max_group_size collects the trials without any repeat
+    first_repeat = np.zeros(max_group_size + 1, dtype=np.int64)
+    remaining = trials
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        birthdays = _draw_birthdays(rng, n, max_group_size, days)
+        # A stable sort keeps equal birthdays in order of appearance, so the
+        # right element of every equal pair is a repeat and the smallest such
+        # position is the first repeat of the row
+        order = np.argsort(birthdays, axis=1, kind="stable")
+        ordered = np.take_along_axis(birthdays, order, axis=1)
+        repeat_at = np.where(ordered[:, 1:] == ordered[:, :-1], order[:, 1:], max_group_size)
+        first = repeat_at.min(axis=1) if max_group_size > 1 else np.full(n, max_group_size)
+        first_repeat += np.bincount(first, minlength=max_group_size + 1)
+        remaining -= n
+
+    curve = np.zeros(max_group_size + 1)
+    # P(shared | n people) = P(first repeat index < n)
+    curve[1:] = np.cumsum(first_repeat[:-1]) / trials
+    return curve
+
+
+def _log_no_shared_exact(group_size, days):
+    """
+    Returns log P(no shared birthday) from the exact product form.
+
+    The cumulative products (1 - 1/d)(1 - 2/d)... are kept in log-space, so
+    tiny collision probabilities (e.g. d = 2**64) do not round away, and are
+    memoized per `days`: after the first query, every group size up to the
+    largest one seen so far is a table lookup. Tables stop growing at
+    EXACT_TABLE_LIMIT entries, and only the EXACT_TABLE_DAYS most recently
+    used ones are kept.
+    """
+    table = _NO_SHARED_LOG_PRODUCTS.get(days)
+    if table is None:
+        table = _NO_SHARED_LOG_PRODUCTS[days] = array("d", [0.0])
+        if len(_NO_SHARED_LOG_PRODUCTS) > EXACT_TABLE_DAYS:
+            _NO_SHARED_LOG_PRODUCTS.popitem(last=False)
+    else:
+        _NO_SHARED_LOG_PRODUCTS.move_to_end(days)
+    if group_size < len(table):
+        return table[group_size]
+    log_product = table[-1]
+    for k in range(len(table) - 1, group_size):
+        # Person k + 1 must avoid the k birthdays already taken
+        log_product += math.log1p(-k / days)
+        if k < EXACT_TABLE_LIMIT:
+            table.append(log_product)
+    return log_product
+
+
+def _log_no_shared(group_size, days):
+    """
+    Returns log P(no shared birthday) from a Stirling closed form.
+
+    log(d! / ((d - n)! * d^n)) costs O(1) for any group size, but taking it
+    as a difference of two log-gammas cancels when n is much smaller than d
+    (hash collisions). With m = d - n and x = n / d, Stirling's series gives
+
+        -d * ((1 - x) * log(1 - x) + x) - log(1 - x) / 2 + c(d) - c(m),
+
+    whose first term is summed as a power series for small x.
+    """
+    n, m = group_size, days - group_size
+    if m < STIRLING_MIN_REST:
+        # Few days left over: the result is large and nothing cancels
+        return math.lgamma(days + 1) - math.lgamma(m + 1) - n * math.log(days)
+    x = n / days
+    if x < 0.25:
+        # (1 - x) * log(1 - x) + x = sum of x^k / (k * (k - 1)) for k >= 2
+        terms = []
+        power, k = x * x, 2
+        while power > 1e-17 * x * x:
+            terms.append(power / (k * (k - 1)))
+            power *= x
+            k += 1
+        head = math.fsum(terms)
+    else:
+        head = (1 - x) * math.log1p(-x) + x
+    # c(y) = 1/(12y) - 1/(360y^3) + 1/(1260y^5), with 1/d - 1/m = -n / (d * m)
+    correction = -n / (12 * days * m) - (days**-3 - m**-3) / 360 + (days**-5 - m**-5) / 1260
+    return -days * head - math.log1p(-x) / 2 + correction
+
+
+def _log_no_shared_approx(group_size, days):
+    """
+    Returns a Taylor approximation of log P(no shared birthday).
+
+    Sums the first two terms of -log(1 - k/d) over k < n. Accurate when the
+    group is much smaller than the number of days, e.g. hash collisions.
+    """
+    n = group_size
+    return -n * (n - 1) / (2 * days) - (n - 1) * n * (2 * n - 1) / (12 * days**2)
+
+
+def _no_shared_weighted(group_size, weights):
+    """
+    Returns the exact probability of no shared birthday for non-uniform days.
+
+    All birthdays are distinct with probability n! * e_n(p_1, ..., p_d), where
+    e_n is the elementary symmetric polynomial of the day probabilities. The
+    scaled values k! * e_k are built one day at a time to avoid overflow.
+    """
+    scaled = [1.0] + [0.0] * group_size
+    for p in weights:
+        for k in range(group_size, 0, -1):
+            scaled[k] += k * p * scaled[k - 1]
+    return scaled[group_size]
+
+
+def birthday_probability(group_size=23, days=365, weights=None, method="auto", trials=1_000_000, seed=None):
+    """
+    Computes the probability of a shared birthday without (or with) simulation.
+
+    Methods:
+        - "exact": product of (1 - k/days), memoized per `days`. With `weights`,
+          the exact evaluator for non-uniform birthdays.
+        - "log": Stirling closed form, O(1) for any group size.
+        - "approx": Taylor approximation for groups much smaller than `days`.
+        - "montecarlo": the vectorized simulation.
+        - "auto": picks the cheapest accurate method for the arguments.
+
+    Args:
+        group_size (int): The number of people in the group.
+        days (int): The number of possible birthdays, e.g. 2**32 for a hash.
+        weights (sequence of float, optional): Relative likelihood of each day.
+            Defaults to uniform birthdays; when given, `days` is its length.
+        method (str): One of "auto", "exact", "log", "approx" or "montecarlo".
+        trials (int): The number of trials used by the Monte Carlo method.
+        seed (int, optional): Seed used by the Monte Carlo method.
+
+    Returns:
+        float: The probability of at least two people sharing a birthday.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method: {method!r}")
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)
+        days = len(weights)
+        weights = weights / weights.sum()
+        if method == "auto":
+            method = "exact" if group_size * days <= EXACT_WEIGHTED_LIMIT else "montecarlo"
+        if method not in ("exact", "montecarlo"):
+            raise ValueError(f"Method {method!r} does not support weighted birthdays")
+
+    if method == "auto":
+        if group_size <= EXACT_TABLE_LIMIT:
+            method = "exact"
+        elif group_size * 1000 < days:
+            method = "approx"
+        else:
+            method = "log"
+
+    if method == "montecarlo":
+        return birthday_simulation_vectorized(group_size, trials, seed, days=days, weights=weights)
+    # Pigeonhole: with more people than days a birthday is always shared
+    if group_size > days:
+        return 1.0
+    if method == "exact":
+        if weights is not None:
+            return 1 - _no_shared_weighted(group_size, weights)
+        return -math.expm1(_log_no_shared_exact(group_size, days))
+    if method == "log":
+        return -math.expm1(_log_no_shared(group_size, days))
+    return -math.expm1(_log_no_shared_approx(group_size, days))
+
+
+def birthday_convergence(group_size=23, trials=1_000_000, max_points=10_000, seed=None, chunk_size=None, days=365):
+    """
+    Records how the Monte Carlo estimate converges as trials accumulate.
+
+    The running estimate is only stored at up to `max_points` log-spaced
+    checkpoints, so memory stays constant however many trials run while
+    the early, noisy part of the curve keeps its detail.
+
+    Args:
+        group_size (int): The number of people in the group.
+        trials (int): The number of times to run the simulation.
+        max_points (int): The maximum number of checkpoints recorded.
+        seed (int, optional): Seed for the NumPy random generator.
+        chunk_size (int, optional): The number of trials processed per chunk.
+        days (int): The number of possible birthdays.
+
+    Returns:
+        tuple: The array of checkpoints (trials run so far) and the array of
+        running probability estimates at those checkpoints.
+    """
+    rng = np.random.default_rng(seed)
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_ELEMENTS // max(group_size, 1))
+    checkpoints = np.unique(np.geomspace(1, trials, max_points).astype(np.int64))
+    estimates = np.empty(len(checkpoints))
+    same_birthday = 0
+    done = 0
+    next_index = 0
+    while done < trials:
+        n = min(chunk_size, trials - done)
+        shared = _has_shared(_draw_birthdays(rng, n, group_size, days))
+        running = same_birthday + np.cumsum(shared)
+        # Checkpoints that fall inside this chunk
+        stop = np.searchsorted(checkpoints, done + n, side="right")
+        points = checkpoints[next_index:stop]
+        estimates[next_index:stop] = running[points - done - 1] / points
+        next_index = stop
+        same_birthday = int(running[-1])
+        done += n
+    return checkpoints, estimates
+
+
+class AdaptiveResult(NamedTuple):
+    """Estimate returned by the adaptive (sequential-stopping) simulators."""
+
+    probability: float
+    trials: int
+    ci_low: float
+    ci_high: float
+
+
+def wilson_interval(successes, trials, confidence=0.95):
+    """
+    Computes the Wilson score confidence interval of a binomial proportion.
+
+    Args:
+        successes (int): The number of successful trials.
+        trials (int): The total number of trials.
+        confidence (float): The confidence level of the interval.
+
+    Returns:
+        tuple: The lower and upper bound of the interval.
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z**2 / trials
+    center = (p + z**2 / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z**2 / (4 * trials**2)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def birthday_simulation_adaptive(
+    group_size=23,
+    target_half_width=0.001,
+    confidence=0.95,
+    batch_size=100_000,
+    max_trials=None,
+    time_budget=None,
+    seed=None,
+    days=365,
+):
+    """
+    Simulates the birthday problem until the estimate is precise enough.
+
+    Trials run in batches with the vectorized engine. After every batch the
+    Wilson confidence interval is updated, and the simulation stops once its
+    half-width reaches `target_half_width`, or when `max_trials` or the
+    `time_budget` is exhausted.
+
+    Args:
+        group_size (int): The number of people in the group.
+        target_half_width (float): The wanted half-width of the confidence interval.
+        confidence (float): The confidence level of the interval.
+        batch_size (int): The number of trials run between two checks.
+        max_trials (int, optional): Hard limit on the number of trials.
+        time_budget (float, optional): Hard limit on the run time, in seconds.
+        seed (int, optional): Seed for the NumPy random generator.
+        days (int): The number of possible birthdays.
+
+    Returns:
+        AdaptiveResult: The probability, the trials used and the achieved interval.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    if max_trials is not None and max_trials < 1:
+        raise ValueError(f"max_trials must be at least 1, got {max_trials}")
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    same_birthday = 0
+    trials = 0
+    while True:
+        n = batch_size if max_trials is None else min(batch_size, max_trials - trials)
+        same_birthday += _count_shared(rng, group_size, n, days=days)
+        trials += n
+        ci_low, ci_high = wilson_interval(same_birthday, trials, confidence)
+        if (ci_high - ci_low) / 2 <= target_half_width:
+            break
+        if max_trials is not None and trials >= max_trials:
+            break
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            break
+    return AdaptiveResult(same_birthday / trials, trials, ci_low, ci_high)
+
+
+def birthday_curve_cached(max_group_size=100, trials=1_000_000, seed=0, days=365, cache=None):
+    """
+    Returns `birthday_curve` results from a cache when the same sweep ran before.
+
+    Args:
+        max_group_size (int): The largest group size of the curve.
+        trials (int): The number of times to run the simulation.
+        seed (int): Seed for the NumPy random generator. Unseeded sweeps are
+            not reproducible and are never cached.
+        days (int): The number of possible birthdays.
+        cache (ResultCache, optional): The cache to use. Defaults to an
+            in-process cache shared by all calls.
+
+    Returns:
+        numpy.ndarray: The probability curve, as returned by `birthday_curve`.
+    """
+    global _default_cache
+    if cache is None:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        cache = _default_cache
+    params = {"max_group_size": max_group_size, "trials": trials, "days": days}
+    return cache.get_or_compute(
+        "birthday_curve",
+        ENGINE_VERSION,
+        params,
+        seed,
+        lambda: birthday_curve(max_group_size, trials, seed, days=days),
+    )
+
+
+def benchmark(group_size=23, trials=100_000):
+    """
+    Measures the speedup of the vectorized engine over the Python loop.
+
+    Args:
+        group_size (int): The number of people in the group.
+        trials (int): The number of trials given to each engine.
+
+    Returns:
+        tuple: The loop time, the vectorized time (both in seconds) and the speedup.
+    """
+    start = time.perf_counter()
+    birthday_simulation(group_size, trials)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    birthday_simulation_vectorized(group_size, trials)
+    vectorized_time = time.perf_counter() - start
+
+    return loop_time, vectorized_time, loop_time / vectorized_time
+
+
 if __name__ == "__main__":
     # List of group sizes to simulate
-    for n in [5, 10, 20, 23, 30, 50, 100]:
-        # Run the simulation for each group size
-        p = birthday_simulation(group_size=n)
-        # Print the result
-        print(f"Group of {n}: Probability of shared birthday: {p:.4f}")
\ No newline at end of file
+    group_sizes = [5, 10, 20, 23, 30, 50, 100]
+    # Simulate the whole probability curve once, up to the largest group size;
+    # repeated runs of the same sweep are answered from the on-disk cache
+    cache = ResultCache(path=CACHE_FILE)
+    curve = birthday_curve_cached(max_group_size=max(group_sizes), cache=cache)
+    cache.close()
+    for n in group_sizes:
+        # Print the result next to the exact value
+        exact = birthday_probability(group_size=n, method="exact")
+        print(f"Group of {n}: Probability of shared birthday: {curve[n]:.4f} (exact: {exact:.4f})")
+
+    # Compare the vectorized engine against the original loop
+    loop_time, vectorized_time, speedup = benchmark()
+    print(f"\nLoop: {loop_time:.2f}s | Vectorized: {vectorized_time:.2f}s | Speedup: {speedup:.0f}x")
\ No newline at end of file
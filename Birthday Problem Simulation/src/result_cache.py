@@ -0,0 +1,193 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Content-addressed cache for simulation results.
+
+    Results are keyed on a hash of the engine name, the engine version, the
+    parameters and the seed, so an identical request returns the stored
+    result and any change to the engine invalidates it. Entries live in an
+    in-process LRU and, when `path` is given, in a SQLite file shared by
+    later runs. Both stores evict by total size and by age.
+
+    Args:
+        max_entries (int): Maximum number of results kept in memory.
+        max_bytes (int): Maximum total size of the results kept in memory.
+        max_age (float, optional): Seconds after which a result expires.
+        path (str, optional): SQLite file of the on-disk store.
+        max_disk_bytes (int): Maximum total size of the on-disk store.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 << 20, max_age=None, path=None, max_disk_bytes=1 << 30):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        # key -> (pickled value, creation time)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value BLOB, size INTEGER, created REAL, accessed REAL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(engine, version, params, seed):
+        """
+        Builds the content address of a simulation request.
+
+        Args:
+            engine (str): Name of the simulation engine.
+            version: Version of the engine; bump it when results change.
+            params (dict): The parameters of the simulation.
+            seed (int): The random seed.
+
+        Returns:
+            str: A hex digest identifying the request.
+        """
+        payload = json.dumps(
+            {"engine": engine, "version": version, "params": params, "seed": seed},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created, now):
+        return self.max_age is not None and now - created > self.max_age
+
+    def _remember(self, key, blob, created):
+        """Stores a pickled value in the in-memory LRU and evicts what no longer fits."""
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key)[0])
+        self._memory[key] = (blob, created)
+        self._memory_bytes += len(blob)
+        while self._memory and (len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes):
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def get(self, key, default=None):
+        """
+        Returns the cached result of `key`, or `default` on a miss.
+
+        Args:
+            key (str): A key built with `make_key`.
+            default: Value returned when the result is not cached.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                blob, created = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return pickle.loads(blob)
+                self._memory_bytes -= len(blob)
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    blob, created = row
+                    if not self._expired(created, now):
+                        self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, blob, created)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return pickle.loads(blob)
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """
+        Stores a result under `key`.
+
+        Args:
+            key (str): A key built with `make_key`.
+            value: Any picklable result.
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._lock:
+            self._remember(key, blob, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, len(blob), now, now),
+                )
+                self._evict_disk(now)
+                self._db.commit()
+
+    def _evict_disk(self, now):
+        """Deletes expired results, then the least recently used ones until the store fits."""
+        if self.max_age is not None:
+            self._db.execute("DELETE FROM results WHERE created < ?", (now - self.max_age,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM results ORDER BY accessed").fetchall()
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+
+    def get_or_compute(self, engine, version, params, seed, compute):
+        """
+        Returns the cached result of a request, computing and storing it on a miss.
+
+        Requests without a seed are not reproducible, so they are always computed
+        and never cached.
+
+        Args:
+            engine (str): Name of the simulation engine.
+            version: Version of the engine.
+            params (dict): The parameters of the simulation.
+            seed (int, optional): The random seed.
+            compute (callable): Called without arguments to produce the result.
+        """
+        if seed is None:
+            return compute()
+        key = self.make_key(engine, version, params, seed)
+        missing = object()
+        result = self.get(key, missing)
+        if result is missing:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    @property
+    def stats(self):
+        """Hit and miss counters along with the size of the in-memory store."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "entries": len(self._memory),
+            "bytes": self._memory_bytes,
+        }
+
+    def close(self):
+        """Closes the on-disk store."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,152 @@
+"""Benchmark and accuracy check for dedupe.py.
+
+Generates a synthetic book where a fraction of the contacts were added a
+second time with the kind of noise real imports have (typos, swapped
+name order, reformatted phone numbers, changed case, missing fields).
+The book also has households, relatives sharing a last name, a phone
+and an address, which must not be merged. The script runs `find_duplicates` on it and reports the time taken and how many of
+the known duplicates were found (recall) and how many of the reported
+pairs are real duplicates (precision).
+
+Usage:
+
+    python bench_dedupe.py --contacts 1000000
+    python bench_dedupe.py --contacts 100000 --duplicates 0.2 --threshold 0.7
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from dedupe import DEFAULT_THRESHOLD, MAX_BLOCK, find_duplicates
+
+SYLLABLES = (
+    "an", "ber", "bo", "ca", "da", "del", "el", "fa", "gan", "ha", "is", "jo", "ka", "lin", "lo", "ma",
+    "mer", "na", "ni", "or", "pa", "ra", "ri", "sa", "sen", "ta", "tor", "vi", "wen", "zo",
+)
+DOMAINS = ("example.com", "mail.example", "post.example", "inbox.example")
+# Fraction of the original contacts that are a relative of another one
+RELATIVES = 0.05
+
+
+def _word(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+
+def _typo(rng: random.Random, word: str) -> str:
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:  # swap two letters
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == 1:  # drop a letter
+        return word[:i] + word[i + 1:]
+    return word[:i] + rng.choice("aeiou") + word[i + 1:]  # change a letter
+
+
+def _noisy_copy(rng: random.Random, name: str, info: Dict[str, str]) -> Tuple[str, Dict[str, str]]:
+    first, last = name.split(" ", 1)
+    kind = rng.randrange(4)
+    if kind == 0:
+        name = f"{last}, {first}"
+    elif kind == 1:
+        name = f"{first} {_typo(rng, last)}"
+    elif kind == 2:
+        name = f"{_typo(rng, first)} {last}"
+    else:
+        name = name.upper()
+    digits = info["phone"].replace(" ", "")
+    copy = {
+        # "+1 555 0123456" -> "(555) 012-3456"
+        "phone": f"({digits[2:5]}) {digits[5:8]}-{digits[8:]}",
+        "email": info["email"].upper() if rng.random() < 0.5 else info["email"],
+        "address": info["address"],
+    }
+    # Imports often miss a field
+    dropped = rng.choice(("phone", "email", "address", None))
+    if dropped:
+        copy[dropped] = ""
+    return name, copy
+
+
+def make_book(count: int, duplicates: float, seed: int = 1) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str]]:
+    """Return a book of `count` contacts, and the original of each noisy copy."""
+    rng = random.Random(seed)
+    originals = int(count / (1 + duplicates))
+    book: Dict[str, Dict[str, str]] = {}
+    names: List[str] = []
+    while len(book) < originals:
+        first = _word(rng, rng.randint(2, 3))
+        if names and rng.random() < RELATIVES:
+            relative = rng.choice(names)
+            last = relative.split(" ", 1)[1]
+            phone, address = book[relative]["phone"], book[relative]["address"]
+        else:
+            last = _word(rng, rng.randint(2, 4))
+            phone = f"+1 {rng.randrange(200, 1000)} {rng.randrange(10**7):07d}"
+            address = f"{rng.randrange(1, 200)} {_word(rng, 2)} Street"
+        name = f"{first} {last}"
+        if name in book:
+            continue
+        book[name] = {
+            "phone": phone,
+            "email": f"{first.lower()}.{last.lower()}{len(book) % 100}@{rng.choice(DOMAINS)}",
+            "address": address,
+        }
+        names.append(name)
+    originals_of: Dict[str, str] = {}
+    while len(book) < count:
+        original = rng.choice(names)
+        name, info = _noisy_copy(rng, original, book[original])
+        if name not in book:
+            book[name] = info
+            originals_of[name] = original
+    return book, originals_of
+
+
+def run(count: int, duplicates: float, threshold: float, max_block: int) -> None:
+    start = time.perf_counter()
+    book, originals_of = make_book(count, duplicates)
+    # Two copies of the same original are duplicates of each other too
+    members: Dict[str, List[str]] = {}
+    for copy, original in originals_of.items():
+        members.setdefault(original, [original]).append(copy)
+    truth = {pair for group in members.values() for pair in _pairs(sorted(group))}
+    print(f"Generated {len(book):,} contacts with {len(originals_of):,} noisy copies "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    groups, stats = find_duplicates(book, threshold, max_block)
+    print(f"find_duplicates: {stats.seconds:.1f}s, {stats.candidate_pairs:,} candidate pairs "
+          f"({stats.candidate_pairs / max(len(book), 1):.2f} per contact), {stats.skipped_blocks} blocks skipped")
+
+    found = {pair for group in groups for pair in _pairs(group)}
+    true_positives = len(found & truth)
+    precision = true_positives / len(found) if found else 1.0
+    recall = true_positives / len(truth) if truth else 1.0
+    print(f"{stats.groups:,} groups, {len(found):,} pairs: precision {precision:.1%}, recall {recall:.1%}")
+
+
+def _pairs(group: List[str]) -> Iterator[Tuple[str, str]]:
+    """Pairs of the names of a sorted group, each in sorted order."""
+    return ((a, b) for i, a in enumerate(group) for b in group[i + 1:])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of the contact deduplication")
+    parser.add_argument("--contacts", type=int, default=1_000_000, help="Number of contacts (default: 1000000)")
+    parser.add_argument("--duplicates", type=float, default=0.1,
+                        help="Duplicates per original contact (default: 0.1)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Score needed to merge (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--max-block", type=int, default=MAX_BLOCK,
+                        help=f"Largest block compared pairwise (default: {MAX_BLOCK})")
+    args = parser.parse_args(argv)
+    run(args.contacts, args.duplicates, args.threshold, args.max_block)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Memory benchmark for the in-memory representations of a contact book.
+
+Builds a synthetic book where cities and email domains repeat, as they do
+in real books, and measures with `tracemalloc` how much memory it takes
+as loaded from JSON (a dict per contact), as packed `Contact` records and
+as `ContactColumns`.
+
+Usage:
+
+    python bench_memory.py --contacts 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from contact_record import ContactColumns, pack
+
+CITIES = 500
+DOMAINS = 200
+
+
+def make_book_json(count: int) -> str:
+    """Return the JSON text of a synthetic book of `count` contacts."""
+    book = {}
+    for i in range(count):
+        book[f"Contact {i:07d}"] = {
+            "phone": f"+1 555 {i:07d}",
+            "email": f"user{i}@domain{i % DOMAINS}.example",
+            "address": f"{i % CITIES} Main Street, City {i % CITIES}",
+        }
+    return json.dumps(book)
+
+
+def measure(build):
+    """Return (result, bytes allocated by `build` and still alive, seconds)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def run(count: int) -> None:
+    text = make_book_json(count)
+    rows = [
+        ("dicts (json.load)", lambda: json.loads(text)),
+        ("Contact records (pack)", lambda: pack(json.loads(text))),
+        ("ContactColumns", lambda: ContactColumns.from_mapping(json.loads(text))),
+    ]
+    print(f"{count:,} contacts, {CITIES} distinct addresses, {DOMAINS} distinct email domains")
+    baseline = None
+    for label, build in rows:
+        result, size, elapsed = measure(build)
+        del result
+        baseline = baseline or size
+        print(f"  {label:<24} {size / 2**20:8.1f} MB  {size / count:6.0f} B/contact  "
+              f"{size / baseline:5.0%}  built in {elapsed:.2f}s")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Memory used by the contact book representations")
+    parser.add_argument("--contacts", type=int, default=1_000_000, help="Number of contacts (default: 1000000)")
+    args = parser.parse_args(argv)
+    run(args.contacts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Startup benchmark for contact_cli.py.
+
+Reports what importing `contact_cli` costs (`python -X importtime`),
+then the wall time of single commands, each run as a fresh process the
+way shell scripts run them, on JSON books of several sizes. Every
+command is timed twice: parsing the JSON file (`--no-cache`) and loading
+the snapshot cache.
+
+Usage:
+
+    python bench_startup.py
+    python bench_startup.py --sizes 1000 100000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from bench_memory import make_book_json
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(HERE, "contact_cli.py")
+
+
+def import_times(top: int = 8) -> Tuple[int, List[Tuple[int, int, str]]]:
+    """Return the total import time of contact_cli and its slowest imports (µs)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import contact_cli"],
+        cwd=HERE, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        # The module name is indented by two spaces per level of nesting
+        rows.append((int(self_us), int(cumulative), name[1:].rstrip()))
+    total = next(cumulative for _, cumulative, name in rows if name == "contact_cli")
+    direct = [row for row in rows if row[2].startswith("  ") and row[2][2] != " "]
+    return total, sorted(direct, key=lambda row: -row[1])[:top]
+
+
+def write_book(path: str, count: int) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        # Pretty-printed, like the files written by contact_cli.py
+        json.dump(json.loads(make_book_json(count)), fh, indent=2)
+
+
+def run_cli(args: List[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, CLI, "--no-service"] + args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return time.perf_counter() - start
+
+
+def commands(path: str, count: int) -> List[Tuple[str, List[List[str]]]]:
+    """Commands to time, each as the list of invocations making up one run."""
+    book = ["--path", path]
+    name = f"Contact {count // 2:07d}"
+    return [
+        ("--help", [["--help"]]),
+        ("view", [book + ["view", name]]),
+        ("list --limit 20", [book + ["list", "--limit", "20"]]),
+        ("search", [book + ["search", name[:-2]]]),
+        # Run as a pair so the book is unchanged for the next run
+        ("add + delete", [
+            book + ["add", "Benchmark", "--phone", "1", "--email", "b@example.com", "--address", "Here"],
+            book + ["delete", "Benchmark"],
+        ]),
+    ]
+
+
+def time_command(runs: List[List[str]], cache: bool, repeat: int) -> float:
+    """Median wall time of `runs` in seconds, after one untimed warm-up run."""
+    flags = [] if cache else ["--no-cache"]
+    # Warms the OS file cache and, with `cache`, writes the snapshot cache
+    for args in runs:
+        run_cli(flags + args)
+    times = []
+    for _ in range(repeat):
+        times.append(sum(run_cli(flags + args) for args in runs))
+    return statistics.median(times)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Startup benchmark for contact_cli.py")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000],
+                        help="Book sizes (default: 1000 100000 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per command, the median is reported (default: 3)")
+    args = parser.parse_args(argv)
+
+    total, slowest = import_times()
+    print(f"import contact_cli: {total / 1000:.1f} ms (python -X importtime)")
+    for self_us, cumulative, name in slowest:
+        print(f"  {name.strip():<20} {cumulative / 1000:6.1f} ms")
+    if os.environ.get("PYTHONDONTWRITEBYTECODE"):
+        print("  (PYTHONDONTWRITEBYTECODE is set: modules are compiled on every run)")
+
+    print(f"\n{'contacts':>10}  {'command':<16} {'no cache':>10} {'cache':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            path = os.path.join(directory, f"contacts-{count}.json")
+            write_book(path, count)
+            for label, runs in commands(path, count):
+                plain = time_command(runs, cache=False, repeat=args.repeat)
+                cached = time_command(runs, cache=True, repeat=args.repeat)
+                print(f"{count:>10,}  {label:<16} {plain * 1000:8.0f}ms {cached * 1000:8.0f}ms {plain / cached:7.1f}x",
+                      flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,20 @@
 """Contact Book CLI using argparse.
 
 Features:
-- Subcommands: add, edit, view, delete, list
-- Optional color output using `colorama` (falls back to plain text)
+- Subcommands: add, edit, view, delete, list, search, migrate, import,
+  export, dedupe
+- `serve` mode: a daemon keeping the book in memory behind a Unix
+  socket, used automatically by the other subcommands while it runs
+- Paginated, streaming `list` (`--limit`, `--after`, `--fields`) with
+  text, JSON-lines and CSV output
+- Optional color output using `colorama` when writing to a terminal
+  (falls back to plain text)
 - Simple JSON persistence file (`contacts.json`) in the same directory
+- Optional SQLite backend (`--backend sqlite`) for large contact books
+- Optional journaled JSON mode (`--backend journal`): O(1) appends plus
+  periodic compaction
+- Binary snapshot cache (`contacts.json.cache`) so that commands skip
+  parsing the JSON file while it is unchanged
 
 This file depends only on Python standard library, with optional
 colorama for colorized output. To install colorama:
@@ -11,38 +22,146 @@ colorama for colorized output. To install colorama:
     pip install colorama
 
 Run `python contact_cli.py --help` for usage information.
+
+Modules only needed by some commands (colorama, csv, shlex, tempfile,
+the other backends and the service) are imported when first used, to
+keep the startup of short scripted commands fast.
 """
 
 from __future__ import annotations
 
 import argparse
+import gc
+import heapq
+import itertools
 import json
+import marshal
 import os
-from typing import Dict
+import sys
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from contact_record import Contact, pack
 
 try:
-    from colorama import Fore, Style, init as colorama_init
+    import fcntl
+except ImportError:
+    # Windows: no advisory locks, only the optimistic version check
+    fcntl = None
+
+# Plain text until enable_colors() imports colorama
+COLORS_AVAILABLE = False
+
+# Process umask, read by the first save of a new file
+_umask = None
+
+
+# No-op placeholders so references to Fore/Style don't fail.
+class _NoColor:
+    RED = ""
+    GREEN = ""
+    YELLOW = ""
+    CYAN = ""
 
-    colorama_init(autoreset=True)
-    COLORS_AVAILABLE = True
-except Exception:
-    # colorama is optional; if not present we'll print plain text
-    COLORS_AVAILABLE = False
-    # Provide no-op placeholders so references to Fore/Style don't fail.
-    class _NoColor:
-        RED = ""
-        GREEN = ""
-        YELLOW = ""
-        CYAN = ""
 
-    Fore = _NoColor()
-    class _NoStyle:
-        RESET_ALL = ""
+Fore = _NoColor()
 
-    Style = _NoStyle()
+
+class _NoStyle:
+    RESET_ALL = ""
+
+
+Style = _NoStyle()
 
 
 STORAGE_FILE = os.path.join(os.path.dirname(__file__), "contacts.json")
+DB_FILE = os.path.join(os.path.dirname(__file__), "contacts.db")
+
+LIST_FIELDS = ("name", "phone", "email", "address")
+# `list` output is written in chunks of this many lines; the first chunk
+# is flushed on its own so a terminal shows the first page at once.
+FIRST_PAGE_LINES = 50
+CHUNK_LINES = 1000
+
+CACHE_SUFFIX = ".cache"
+# Bumped whenever the layout of the snapshot cache changes
+CACHE_FORMAT = 1
+
+
+def enable_colors() -> bool:
+    """Import colorama and turn colored output on, if colorama is installed.
+
+    Only called when stdout is a terminal, so piped and scripted
+    commands never pay for the import.
+    """
+    global COLORS_AVAILABLE, Fore, Style
+    try:
+        from colorama import Fore, Style, init as colorama_init
+
+        colorama_init(autoreset=True)
+    except Exception:
+        # colorama is optional; if not present we'll print plain text
+        return False
+    COLORS_AVAILABLE = True
+    return True
+
+
+@contextmanager
+def _gc_paused():
+    """Suspend the cyclic garbage collector, e.g. while loading a large book.
+
+    Building a million records otherwise triggers dozens of full
+    collections that find nothing to free.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _file_mode(path: str) -> int:
+    """Return the permissions of `path`, or those `open` would give it if it is missing."""
+    global _umask
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        pass
+    if _umask is None:
+        # Reading the umask means setting it: do it once
+        _umask = os.umask(0o022)
+        os.umask(_umask)
+    return 0o666 & ~_umask
+
+
+def _replace_atomically(path: str, write, binary: bool = False, durable: bool = True) -> os.stat_result:
+    """Call `write(fh)` on a temporary file, then rename it over `path`.
+
+    `durable` flushes the data to disk before the rename. Returns the
+    status of the new file.
+    """
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".contacts-", suffix=".tmp", dir=directory)
+    try:
+        if hasattr(os, "fchmod"):
+            # mkstemp creates the file readable by its owner only; keep
+            # the permissions of the file being replaced instead
+            os.fchmod(fd, _file_mode(path))
+        with (os.fdopen(fd, "wb") if binary else os.fdopen(fd, "w", encoding="utf-8")) as fh:
+            write(fh)
+            fh.flush()
+            if durable:
+                os.fsync(fh.fileno())
+            st = os.fstat(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return st
 
 
 def colored(text: str, color: str) -> str:
@@ -55,61 +174,592 @@ class ContactBookStorage:
     """Tiny JSON-backed storage for contacts.
 
     The storage structure mirrors the in-memory `ContactBook` used in
-    the example: a mapping of name -> {phone, email, address}.
+    the example: a mapping of name -> {phone, email, address}. In memory,
+    each contact is a slotted `Contact` record (a read-only mapping with
+    the same keys) rather than a dict.
+
+    Several processes may use the same file at once. Every save replaces
+    the file atomically (temporary file + rename), so readers never see
+    a half-written book. Writers take an exclusive `fcntl` lock on
+    `path + ".lock"`, which also holds a counter bumped by every save.
+    Before applying a change, a writer compares that counter (and the
+    identity of the file) with the version it loaded; if another process
+    saved in between, the book is reloaded first, so no update is lost.
+    Without `fcntl` (Windows) there is no lock and the version check
+    alone narrows the window for lost updates.
+
+    A corrupted file raises a `ValueError` instead of silently starting
+    from an empty book that the next save would write back.
+
+    Changes left in `path + ".journal"` by the journaled mode (see
+    `JournaledContactStorage`) are replayed on load, and the journal is
+    emptied by the next save, whose snapshot includes them.
+
+    Parsing the JSON file dominates the startup of every command, so a
+    binary copy of the book is kept in `path + ".cache"` (marshal, a few
+    times faster to load). It records the size, mtime and inode of the
+    JSON file it was made from and is ignored as soon as they differ, so
+    the JSON file stays the source of truth and may still be edited by
+    hand. `cache=False` neither reads nor writes it.
     """
 
-    def __init__(self, path: str = STORAGE_FILE):
+    _in_batch = False
+    # SearchIndex built by the second search, then updated on every change
+    _index = None
+    _searched = False
+
+    def __init__(self, path: str = STORAGE_FILE, cache: bool = True):
         self.path = path
-        self._data: Dict[str, Dict[str, str]] = {}
+        self.lock_path = path + ".lock"
+        self.journal_path = path + ".journal"
+        self._journal_records = 0
+        self.cache_path = path + CACHE_SUFFIX if cache else None
+        self._data: Dict[str, Contact] = {}
+        self._version: tuple = ()
+        with self._locked(exclusive=False):
+            self._load()
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        """Hold the advisory lock of the book, yielding the open lock file.
+
+        Readers take a shared lock so they never observe a write in
+        progress; a read-only directory only skips the shared lock.
+        """
+        try:
+            fh = open(self.lock_path, "a+", encoding="utf-8")
+        except OSError:
+            if exclusive:
+                raise
+            yield None
+            return
+        with fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            # Closing the file releases the lock
+            yield fh
+
+    def _disk_version(self) -> tuple:
+        """Return the save counter from the lock file and the identity of the book file."""
+        try:
+            with open(self.lock_path, "r", encoding="utf-8") as fh:
+                counter = fh.read().strip()
+        except FileNotFoundError:
+            counter = ""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return (counter,)
+        return counter, st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _bump_version(self, lock) -> None:
+        """Record a save in the lock file (the exclusive lock must be held)."""
+        lock.seek(0)
+        counter = lock.read().strip()
+        lock.seek(0)
+        lock.truncate()
+        lock.write(str(int(counter or 0) + 1))
+        lock.flush()
+        self._version = self._disk_version()
+
+    def _refresh(self) -> bool:
+        """Reload the book if another process saved it since it was loaded."""
+        if self._version == self._disk_version():
+            return False
         self._load()
+        self._index = None
+        return True
+
+    def _load_snapshot(self) -> None:
+        # Read the version first: a save landing in between only causes
+        # one extra reload later, never a missed one.
+        self._version = self._disk_version()
+        self._data = {}
+        try:
+            fh = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with fh, _gc_paused():
+            # The status of the open file, so a concurrent rename cannot
+            # pair the cache with another version of the book
+            key = self._cache_key(os.fstat(fh.fileno()))
+            data = self._read_cache(key)
+            if data is None:
+                try:
+                    data = pack(json.load(fh))
+                except (ValueError, AttributeError) as exc:
+                    raise ValueError(f"Corrupted contact book {self.path}: {exc}") from None
+                self._write_cache(key, data)
+            self._data = data
 
     def _load(self) -> None:
-        if not os.path.exists(self.path):
-            self._data = {}
+        self._load_snapshot()
+        self._journal_records = 0
+        try:
+            if os.path.getsize(self.journal_path):
+                self._replay()
+        except FileNotFoundError:
+            pass
+
+    def _replay(self) -> None:
+        """Apply the records of the journal to the loaded snapshot."""
+        with open(self.journal_path, "rb") as fh:
+            lines = fh.readlines()
+        for number, line in enumerate(lines, 1):
+            try:
+                record = json.loads(line)
+                if record["op"] == "set":
+                    self._data[record["name"]] = Contact.from_dict(record["contact"])
+                else:
+                    self._data.pop(record["name"], None)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                if number == len(lines) and not line.endswith(b"\n"):
+                    # Interrupted append, cut off before the next one
+                    break
+                raise ValueError(f"Corrupted journal {self.journal_path} at line {number}") from None
+            self._journal_records += 1
+
+    @staticmethod
+    def _cache_key(st: os.stat_result) -> tuple:
+        return CACHE_FORMAT, sys.implementation.cache_tag, st.st_size, st.st_mtime_ns, st.st_ino
+
+    def _read_cache(self, key: tuple) -> Dict[str, Contact] | None:
+        """Return the book from the snapshot cache, or None if it is missing or stale."""
+        if self.cache_path is None:
+            return None
+        try:
+            with open(self.cache_path, "rb") as fh:
+                if marshal.load(fh) != key:
+                    return None
+                names, phones, emails, addresses = marshal.loads(fh.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return dict(zip(names, map(Contact, phones, emails, addresses)))
+
+    def _write_cache(self, key: tuple, data: Dict[str, Contact]) -> None:
+        """Save `data` as the snapshot cache of the JSON file with the cache `key`."""
+        if self.cache_path is None:
             return
+        # One list per field: marshal only handles built-in types, and
+        # keeps equal addresses shared
+        contacts = data.values()
+        columns = (
+            list(data),
+            [info.phone for info in contacts],
+            [info.email for info in contacts],
+            [info.address for info in contacts],
+        )
+
+        def write(fh):
+            marshal.dump(key, fh)
+            marshal.dump(columns, fh)
+
         try:
-            with open(self.path, "r", encoding="utf-8") as fh:
-                self._data = json.load(fh)
-        except Exception:
-            # If the file is corrupted, reset to empty to avoid crashes.
-            self._data = {}
+            # No fsync: a cache torn by a crash fails to load and is rebuilt
+            _replace_atomically(self.cache_path, write, binary=True, durable=False)
+        except OSError:
+            # Read-only directory or full disk: the cache is only an optimization
+            pass
+
+    def _write_snapshot(self) -> None:
+        """Write the whole book to a temporary file and rename it over `path`."""
+
+        def write(fh):
+            # Contact records are written as plain JSON objects
+            json.dump(self._data, fh, indent=2, ensure_ascii=False, default=dict)
+
+        st = _replace_atomically(self.path, write)
+        # The next command loads the cache instead of parsing the new file
+        self._write_cache(self._cache_key(st), self._data)
 
     def _save(self) -> None:
-        with open(self.path, "w", encoding="utf-8") as fh:
-            json.dump(self._data, fh, indent=2, ensure_ascii=False)
+        self._write_snapshot()
+        if self._journal_records:
+            # The snapshot includes the replayed journal; replaying it
+            # again later would undo this save. Truncated in place, as
+            # journaled processes keep it open for appending
+            os.truncate(self.journal_path, 0)
+            self._journal_records = 0
+
+    def _changed(self, name: str) -> None:
+        """Persist a change to the contact `name` (added, edited or deleted)."""
+        if not self._in_batch:
+            self._save()
+
+    def _commit_batch(self) -> None:
+        self._save()
+
+    def _abort_batch(self) -> None:
+        pass
+
+    def _write(self, name: str, change) -> None:
+        """Apply `change` to the book and persist it.
+
+        `change` is a function that checks and modifies `self._data` for
+        the contact `name`, raising `ValueError` when it does not apply.
+        Under the lock, the version check reloads the book first if
+        another process saved it since it was loaded, so `change` always
+        runs on the latest data.
+        """
+        if self._in_batch:
+            if name not in self._undo:
+                old = self._data.get(name)
+                self._undo[name] = None if old is None else old.copy()
+            change()
+            self._reindex(name)
+            self._changed(name)
+            return
+        with self._locked() as lock:
+            self._refresh()
+            change()
+            self._reindex(name)
+            self._changed(name)
+            self._bump_version(lock)
+
+    @contextmanager
+    def batch(self):
+        """Group changes into one transaction persisted once at the end.
+
+        The book is locked and refreshed for the whole batch. If the block
+        raises, or the batch cannot be saved, the contacts it changed are
+        restored from an undo log (so opening a batch costs nothing
+        however large the book is) and the exception is raised.
+        """
+        with self._locked() as lock:
+            self._refresh()
+            # name -> contact before its first change in the batch (None if absent)
+            self._undo: Dict[str, Contact | None] = {}
+            self._in_batch = True
+            try:
+                yield self
+                self._commit_batch()
+            except BaseException:
+                for name, old in self._undo.items():
+                    if old is None:
+                        self._data.pop(name, None)
+                    else:
+                        self._data[name] = old
+                self._index = None
+                self._abort_batch()
+                raise
+            finally:
+                self._in_batch = False
+                self._undo = {}
+            self._bump_version(lock)
 
     def add(self, name: str, phone: str, email: str, address: str) -> None:
-        if name in self._data:
-            raise ValueError("Contact already exists")
-        self._data[name] = {"phone": phone, "email": email, "address": address}
-        self._save()
+        def change():
+            if name in self._data:
+                raise ValueError("Contact already exists")
+            self._data[name] = Contact(phone, email, address)
+
+        self._write(name, change)
 
     def edit(self, name: str, phone: str | None, email: str | None, address: str | None) -> None:
-        if name not in self._data:
-            raise ValueError("Contact not found")
-        if phone:
-            self._data[name]["phone"] = phone
-        if email:
-            self._data[name]["email"] = email
-        if address:
-            self._data[name]["address"] = address
-        self._save()
+        def change():
+            if name not in self._data:
+                raise ValueError("Contact not found")
+            self._data[name].edit(phone, email, address)
+
+        self._write(name, change)
 
     def delete(self, name: str) -> None:
-        if name not in self._data:
-            raise ValueError("Contact not found")
-        del self._data[name]
-        self._save()
+        def change():
+            if name not in self._data:
+                raise ValueError("Contact not found")
+            del self._data[name]
+
+        self._write(name, change)
 
-    def list_all(self) -> Dict[str, Dict[str, str]]:
+    def list_all(self) -> Dict[str, Contact]:
         return dict(self._data)
 
-    def get(self, name: str) -> Dict[str, str] | None:
+    def iter_sorted(self, after: str | None = None, limit: int | None = None) -> Iterator[Tuple[str, Contact]]:
+        """Yield (name, info) pairs in name order, starting after the name `after`.
+
+        Only what is asked for gets sorted: a page of `limit` contacts
+        costs O(n log limit), and a full listing yields its first contact
+        after a linear-time heapify instead of a full sort.
+        """
+        names = self._data if after is None else (name for name in self._data if name > after)
+        if limit is not None:
+            ordered: Iterable[str] = heapq.nsmallest(limit, names)
+        else:
+            heap = list(names)
+            heapq.heapify(heap)
+            ordered = (heapq.heappop(heap) for _ in range(len(heap)))
+        for name in ordered:
+            # Skip contacts deleted while the caller was iterating
+            info = self._data.get(name)
+            if info is not None:
+                yield name, info
+
+    def get(self, name: str) -> Contact | None:
         return self._data.get(name)
 
+    def search(self, query: str, limit: int = 10, field: str | None = None) -> List[str]:
+        """Return up to `limit` names matching `query`, best matches first.
+
+        `field` is "name", "phone" or "email"; by default it is guessed
+        from the query (see `SearchIndex.search`). Building the index
+        costs many times more than a scan of the book, so the first
+        search is a scan, and the index is only built by the next one
+        (a service or a script searching repeatedly).
+        """
+        if self._index is None:
+            if not self._searched:
+                from search_index import scan
+
+                self._searched = True
+                rows = ((name, info.phone, info.email) for name, info in self._data.items())
+                return scan(rows, query, limit, field)
+            from search_index import SearchIndex
+
+            self._index = SearchIndex(self._data)
+        return self._index.search(query, limit, field)
+
+    def _reindex(self, name: str) -> None:
+        if self._index is not None:
+            if name in self._data:
+                self._index.add(name, self._data[name])
+            else:
+                self._index.discard(name)
+
+    def close(self) -> None:
+        # Every change is already saved; nothing to release.
+        pass
+
+
+class JournaledContactStorage(ContactBookStorage):
+    """JSON storage that appends changes to a journal instead of rewriting.
+
+    `path` holds the last snapshot (same format as `ContactBookStorage`)
+    and `path + ".journal"` holds one JSON line per change made since:
+    `{"op": "set", "name": ..., "contact": {...}}` or
+    `{"op": "delete", "name": ...}`. Loading replays the journal onto
+    the snapshot (as the plain JSON storage does too), so each change
+    costs an O(1) append. Once the journal
+    holds `compact_every` records the snapshot is rewritten atomically
+    (temporary file + rename) and the journal is emptied.
+
+    `fsync` selects the durability policy: "always" flushes each record
+    to disk before returning, "never" leaves it to the OS.
+
+    A corrupted snapshot or journal raises a `ValueError`. Only a torn
+    last journal line (an interrupted append) is ignored, and cut off
+    before the next append.
+
+    Concurrent processes are handled as in `ContactBookStorage`: appends
+    and compactions happen under the exclusive lock, after reloading the
+    book if another process changed it.
+    """
+
+    def __init__(
+        self, path: str = STORAGE_FILE, fsync: str = "always", compact_every: int = 1000, cache: bool = True
+    ):
+        if fsync not in ("always", "never"):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.fsync = fsync
+        self.compact_every = compact_every
+        self._pending: list = []
+        super().__init__(path, cache)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def _repair_tail(self) -> None:
+        """Cut off a torn last record so new records start on a clean line."""
+        with open(self.journal_path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            size = fh.tell()
+            if size == 0:
+                return
+            fh.seek(-1, os.SEEK_END)
+            if fh.read(1) == b"\n":
+                return
+            # Find the end of the last complete record
+            keep = size
+            while keep > 0:
+                step = min(4096, keep)
+                fh.seek(keep - step)
+                chunk = fh.read(step)
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    keep = keep - step + newline + 1
+                    break
+                keep -= step
+        self._journal.truncate(keep)
+
+    def _changed(self, name: str) -> None:
+        if name in self._data:
+            record = {"op": "set", "name": name, "contact": self._data[name]}
+        else:
+            record = {"op": "delete", "name": name}
+        self._pending.append(json.dumps(record, ensure_ascii=False, default=dict) + "\n")
+        if not self._in_batch:
+            self._commit_batch()
+
+    def _commit_batch(self) -> None:
+        self._repair_tail()
+        # tell() is stale once other processes have appended; the size is
+        # exact, as they only write under the exclusive lock we hold now
+        end = os.fstat(self._journal.fileno()).st_size
+        try:
+            # A batch becomes a single write and a single fsync
+            self._journal.write("".join(self._pending))
+            self._journal.flush()
+            if self.fsync == "always":
+                os.fsync(self._journal.fileno())
+        except OSError:
+            self._reopen_journal(end)
+            raise
+        self._journal_records += len(self._pending)
+        self._pending = []
+        if self._journal_records >= self.compact_every:
+            try:
+                self.compact()
+            except OSError:
+                # The changes are safe in the journal; the next commit retries
+                pass
+
+    def _abort_batch(self) -> None:
+        self._pending = []
+
+    def _reopen_journal(self, size: int) -> None:
+        """Drop the journal file object after a failed write, and cut the file back to `size`.
+
+        The file object may still buffer part of the failed write, and
+        what reached the file must not be replayed once the batch is
+        rolled back.
+        """
+        try:
+            self._journal.close()
+        except OSError:
+            pass
+        try:
+            os.truncate(self.journal_path, size)
+        except OSError:
+            pass
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def compact(self) -> None:
+        """Rewrite the snapshot atomically and empty the journal.
+
+        Must be called with the exclusive lock held.
+        """
+        self._write_snapshot()
+        # Replaying records onto the new snapshot is harmless, so a crash
+        # before the truncation below loses nothing.
+        self._journal.truncate(0)
+        self._journal_records = 0
+
+    def close(self) -> None:
+        self._journal.close()
+
+
+def default_path(backend: str) -> str:
+    return DB_FILE if backend == "sqlite" else STORAGE_FILE
+
+
+def open_storage(backend: str = "json", path: str | None = None, use_service: bool = True, cache: bool = True):
+    """Return the storage for `backend` ("json", "journal" or "sqlite").
+
+    When a contact service (`serve`) is running for the book and
+    `use_service` is true, a client of the service is returned instead.
+    All of them share the add/edit/delete/get/list_all/iter_sorted/search
+    interface. `cache` enables the snapshot cache of the JSON backends.
+    """
+    path = path or default_path(backend)
+    # Check for the socket before importing the service module (see service.socket_path_for)
+    if use_service and os.path.exists(path + ".sock"):
+        from service import connect
+
+        remote = connect(path)
+        if remote is not None:
+            return remote
+    if backend == "sqlite":
+        from sqlite_storage import SQLiteContactStorage
+
+        return SQLiteContactStorage(path)
+    if backend == "journal":
+        return JournaledContactStorage(path, cache=cache)
+    return ContactBookStorage(path, cache=cache)
+
+
+def format_rows(rows: Iterable[Tuple[str, Dict[str, str]]], fields: Sequence[str], fmt: str) -> Iterator[str]:
+    """Yield one output line per (name, info) row, restricted to `fields`.
+
+    `fmt` is "text" (the human-readable listing), "jsonl" or "csv" (with a
+    header line).
+    """
+    if fmt == "jsonl":
+        for name, info in rows:
+            record = {"name": name, **info}
+            yield json.dumps({field: record.get(field, "") for field in fields}, ensure_ascii=False) + "\n"
+    elif fmt == "csv":
+        import csv
+        import io
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(fields)
+        for name, info in rows:
+            record = {"name": name, **info}
+            writer.writerow([record.get(field, "") for field in fields])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # Header only when there are no rows
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        values = [field for field in fields if field != "name"]
+        for name, info in rows:
+            line = " | ".join(info.get(field, "") for field in values)
+            if "name" in fields:
+                name_str = colored(name, Fore.CYAN) if COLORS_AVAILABLE else name
+                line = f"{name_str}: {line}" if values else name_str
+            yield line + "\n"
+
+
+def write_lines(lines: Iterable[str], out=None) -> None:
+    """Write `lines` to `out` (stdout by default) in large chunks."""
+    out = out or sys.stdout
+    lines = iter(lines)
+    chunk = list(itertools.islice(lines, FIRST_PAGE_LINES))
+    while chunk:
+        out.write("".join(chunk))
+        out.flush()
+        chunk = list(itertools.islice(lines, CHUNK_LINES))
+
+
+def parse_fields(value: str) -> Tuple[str, ...]:
+    fields = tuple(field.strip() for field in value.split(",") if field.strip())
+    unknown = [field for field in fields if field not in LIST_FIELDS]
+    if unknown or not fields:
+        raise argparse.ArgumentTypeError(
+            f"invalid field(s) {', '.join(unknown) or value!r}; choose from {', '.join(LIST_FIELDS)}"
+        )
+    return fields
+
 
 def make_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Contact Book CLI")
+    parser.add_argument(
+        "--backend",
+        choices=["json", "journal", "sqlite"],
+        default="json",
+        help="Storage backend (default: json)",
+    )
+    parser.add_argument("--path", help="Storage file (defaults to contacts.json / contacts.db)")
+    parser.add_argument(
+        "--no-service",
+        action="store_true",
+        help="Access the storage directly even if a contact service is running",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse the JSON file instead of using (and refreshing) its snapshot cache",
+    )
     sub = parser.add_subparsers(dest="command", required=True)
 
     # add
@@ -131,20 +781,120 @@ def make_parser() -> argparse.ArgumentParser:
     p_view.add_argument("name")
 
     # list
-    sub.add_parser("list", help="List all contacts")
+    p_list = sub.add_parser("list", help="List contacts in name order")
+    p_list.add_argument("--limit", type=int, help="Maximum number of contacts to list")
+    p_list.add_argument("--after", metavar="NAME", help="Start after this name (the cursor of the previous page)")
+    p_list.add_argument(
+        "--fields",
+        type=parse_fields,
+        default=LIST_FIELDS,
+        help=f"Comma-separated fields to show (default: {','.join(LIST_FIELDS)})",
+    )
+    p_list.add_argument("--format", choices=["text", "jsonl", "csv"], default="text", help="Output format")
+
+    # search
+    p_search = sub.add_parser("search", help="Search contacts by name, phone or email")
+    p_search.add_argument("query")
+    p_search.add_argument("--field", choices=["name", "phone", "email"], help="Field to search (default: guessed)")
+    p_search.add_argument("--limit", type=int, default=10, help="Maximum number of results (default: 10)")
 
     # delete
     p_delete = sub.add_parser("delete", help="Delete a contact")
     p_delete.add_argument("name")
 
+    # serve
+    p_serve = sub.add_parser("serve", help="Run a contact service keeping the book in memory")
+    p_serve.add_argument(
+        "--flush-interval",
+        type=float,
+        default=0.05,
+        help="Seconds between a write and the save of its batch (default: 0.05)",
+    )
+
+    # migrate
+    p_migrate = sub.add_parser("migrate", help="Copy a JSON contact book into a SQLite database")
+    p_migrate.add_argument("--source", default=STORAGE_FILE, help="JSON file to read")
+    p_migrate.add_argument("--dest", default=DB_FILE, help="SQLite database to write")
+
+    # import / export
+    formats = ["csv", "jsonl", "vcard"]
+    p_import = sub.add_parser("import", help="Import contacts from a CSV, JSON-lines or vCard file")
+    p_import.add_argument("file", help='File to read ("-" for stdin)')
+    p_import.add_argument("--format", choices=formats, help="File format (default: from the extension)")
+    p_import.add_argument(
+        "--on-duplicate",
+        choices=["skip", "overwrite", "merge"],
+        default="skip",
+        help="What to do with names that already exist (default: skip)",
+    )
+    p_export = sub.add_parser("export", help="Export contacts to a CSV, JSON-lines or vCard file")
+    p_export.add_argument("file", help='File to write ("-" for stdout)')
+    p_export.add_argument("--format", choices=formats, help="File format (default: from the extension)")
+
+    # dedupe
+    p_dedupe = sub.add_parser("dedupe", help="Find and merge duplicate contacts")
+    p_dedupe.add_argument(
+        "--threshold", type=float, default=0.8, help="Similarity from 0 to 1 needed to merge two contacts (default: 0.8)"
+    )
+    p_dedupe.add_argument(
+        "--keep",
+        choices=["complete", "longest", "first"],
+        default="complete",
+        help="Contact kept in each group: the most complete, the longest name or the first name (default: complete)",
+    )
+    p_dedupe.add_argument(
+        "--fields",
+        choices=["fill", "keep"],
+        default="fill",
+        help="Fill the empty fields of the kept contact from its duplicates, or keep it as is (default: fill)",
+    )
+    p_dedupe.add_argument(
+        "--max-block",
+        type=int,
+        default=100,
+        help="Skip groups of more contacts than this sharing a phone, email or name sound (default: 100)",
+    )
+    p_dedupe.add_argument("--dry-run", action="store_true", help="Show the merges without changing the book")
+
     return parser
 
 
 def main(argv: list[str] | None = None) -> None:
     parser = make_parser()
     args = parser.parse_args(argv)
+    if getattr(args, "limit", None) is not None and args.limit < 1:
+        parser.error("--limit must be at least 1")
+    if args.command == "dedupe" and not 0 < args.threshold <= 1:
+        parser.error("--threshold must be between 0 and 1")
+    if sys.stdout.isatty():
+        enable_colors()
+
+    if args.command == "migrate":
+        from sqlite_storage import migrate_json
+
+        count = migrate_json(args.source, args.dest)
+        print(colored(f"Migrated {count} contacts to {args.dest}", Fore.GREEN))
+        return
 
-    storage = ContactBookStorage()
+    if args.command == "serve":
+        from service import serve, socket_path_for
+
+        path = args.path or default_path(args.backend)
+        try:
+            storage = open_storage(args.backend, path, use_service=False, cache=not args.no_cache)
+            server = serve(storage, socket_path_for(path), args.flush_interval)
+        except ValueError as exc:
+            print(colored(f"Error: {exc}", Fore.RED) if COLORS_AVAILABLE else f"Error: {exc}")
+            return
+        storage.close()
+        print(f"Stopped after {server.writes} writes in {server.flushes} saves")
+        return
+
+    try:
+        storage = open_storage(args.backend, args.path, use_service=not args.no_service, cache=not args.no_cache)
+    except ValueError as exc:
+        print(colored(f"Error: {exc}", Fore.RED) if COLORS_AVAILABLE else f"Error: {exc}")
+        return
 
     try:
         if args.command == "add":
@@ -165,11 +915,32 @@ def main(argv: list[str] | None = None) -> None:
             print(f"  Address: {contact['address']}")
 
         elif args.command == "list":
-            data = storage.list_all()
-            if not data:
+            rows = storage.iter_sorted(args.after, None if args.limit is None else args.limit + 1)
+            cursor = None
+            if args.limit is not None:
+                # One extra contact tells whether there is a next page
+                rows = list(rows)
+                if len(rows) > args.limit:
+                    rows = rows[:args.limit]
+                    cursor = rows[-1][0]
+            rows = iter(rows)
+            first = next(rows, None)
+            if first is None and args.format == "text":
+                print("No contacts found")
+                return
+            write_lines(format_rows(itertools.chain([first] if first else [], rows), args.fields, args.format))
+            if cursor is not None:
+                import shlex
+
+                print(f"More contacts: use --after {shlex.quote(cursor)}", file=sys.stderr)
+
+        elif args.command == "search":
+            names = storage.search(args.query, args.limit, args.field)
+            if not names:
                 print("No contacts found")
                 return
-            for name, info in data.items():
+            for name in names:
+                info = storage.get(name)
                 name_str = colored(name, Fore.CYAN) if COLORS_AVAILABLE else name
                 print(f"{name_str}: {info['phone']} | {info['email']} | {info['address']}")
 
@@ -177,8 +948,52 @@ def main(argv: list[str] | None = None) -> None:
             storage.delete(args.name)
             print(colored("Contact deleted", Fore.RED) if COLORS_AVAILABLE else "Contact deleted")
 
+        elif args.command == "import":
+            from transfer import import_file
+
+            stats = import_file(storage, args.file, args.format, args.on_duplicate)
+            print(colored(
+                f"Imported {stats.added} new, {stats.updated} updated, {stats.skipped} skipped "
+                f"({stats.records_per_second:,.0f} records/s)",
+                Fore.GREEN,
+            ))
+
+        elif args.command == "export":
+            from transfer import export_file
+
+            count, seconds = export_file(storage, args.file, args.format)
+            if args.file != "-":
+                rate = count / seconds if seconds else count
+                print(colored(f"Exported {count} contacts ({rate:,.0f} records/s)", Fore.GREEN))
+
+        elif args.command == "dedupe":
+            from dedupe import dedupe
+
+            merges, stats = dedupe(storage, args.threshold, args.keep, args.fields, args.max_block, args.dry_run)
+            write_lines(
+                f"{colored(survivor, Fore.CYAN) if COLORS_AVAILABLE else survivor} <- {', '.join(merged)}\n"
+                for survivor, merged, _ in merges
+            )
+            verb = "Would merge" if args.dry_run else "Merged"
+            print(colored(
+                f"{verb} {stats.duplicates} duplicates into {stats.groups} contacts "
+                f"({stats.candidate_pairs:,} pairs of {stats.contacts:,} contacts compared in {stats.seconds:.1f}s)",
+                Fore.GREEN,
+            ))
+            if stats.skipped_blocks:
+                print(colored(
+                    f"Skipped {stats.skipped_blocks} groups of more than {args.max_block} similar contacts "
+                    "(see --max-block)",
+                    Fore.YELLOW,
+                ))
+
     except ValueError as exc:
         print(colored(f"Error: {exc}", Fore.RED) if COLORS_AVAILABLE else f"Error: {exc}")
+    except BrokenPipeError:
+        # The reader (e.g. `head`) stopped early; silence the final flush of stdout
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        storage.close()
 
 
 if __name__ == "__main__":
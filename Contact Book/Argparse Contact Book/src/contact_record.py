@@ -0,0 +1,174 @@
+"""Compact in-memory representations of contacts.
+
+`Contact` holds the phone, email and address of one contact in three
+`__slots__` instead of a dict with the same three keys repeated for every
+record, which cuts the per-contact overhead by about two thirds. It is a
+read-only `Mapping`, so code written for the dict records
+(`info["phone"]`, `info.get("email")`, `{**info}`) keeps working.
+
+`pack` converts a whole book to `Contact` records and makes equal
+addresses share one string object (books typically repeat the same
+cities over and over).
+
+`ContactColumns` is a column-oriented copy of a book for bulk analytics:
+one list per field, with email domains and addresses dictionary-encoded
+as integer codes in compact arrays.
+
+Only the Python standard library is required.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+FIELDS = ("phone", "email", "address")
+
+
+class Contact(Mapping):
+    """Phone, email and address of a contact, stored in slots."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, phone: str = "", email: str = "", address: str = ""):
+        self.phone = phone
+        self.email = email
+        self.address = address
+
+    @classmethod
+    def from_dict(cls, info) -> "Contact":
+        return cls(info.get("phone", ""), info.get("email", ""), info.get("address", ""))
+
+    def __getitem__(self, field: str) -> str:
+        if field not in FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Contact(phone={self.phone!r}, email={self.email!r}, address={self.address!r})"
+
+    def edit(self, phone: str | None = None, email: str | None = None, address: str | None = None) -> None:
+        """Replace the fields given a non-empty value; the others are left unchanged."""
+        if phone:
+            self.phone = phone
+        if email:
+            self.email = email
+        if address:
+            self.address = address
+
+    def copy(self) -> "Contact":
+        return Contact(self.phone, self.email, self.address)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"phone": self.phone, "email": self.email, "address": self.address}
+
+
+def pack(book: Mapping) -> Dict[str, Contact]:
+    """Convert a mapping of name -> contact info into `Contact` records.
+
+    Equal addresses end up sharing a single string object. The lookup
+    table used for that is dropped afterwards, so unique addresses cost
+    nothing extra once the book is packed.
+    """
+    addresses: Dict[str, str] = {}
+    packed = {}
+    for name, info in book.items():
+        address = info.get("address", "")
+        packed[name] = Contact(
+            info.get("phone", ""), info.get("email", ""), addresses.setdefault(address, address)
+        )
+    return packed
+
+
+class _Dictionary:
+    """Dictionary encoding: each distinct value gets a small integer code."""
+
+    def __init__(self):
+        self.values: List[str | None] = []
+        self._codes: Dict[str | None, int] = {}
+
+    def encode(self, value: str | None) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ContactColumns:
+    """Column-oriented store of contacts for bulk analytics.
+
+    Names, phones and the local parts of the emails are kept in parallel
+    lists. Email domains and addresses, which repeat a lot, are stored as
+    codes in `array("I")` columns that index `domains` and
+    `address_values`. Rows can only be appended.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.phones: List[str] = []
+        self.email_users: List[str] = []
+        self.email_domains = array("I")
+        self.addresses = array("I")
+        # The domain None stands for an email without "@"
+        self._domains = _Dictionary()
+        self._addresses = _Dictionary()
+
+    @classmethod
+    def from_mapping(cls, book: Mapping) -> "ContactColumns":
+        columns = cls()
+        columns.extend(book.items())
+        return columns
+
+    @property
+    def domains(self) -> List[str | None]:
+        return self._domains.values
+
+    @property
+    def address_values(self) -> List[str]:
+        return self._addresses.values
+
+    def append(self, name: str, info: Mapping) -> None:
+        user, at, domain = (info.get("email") or "").partition("@")
+        self.names.append(name)
+        self.phones.append(info.get("phone", ""))
+        self.email_users.append(user)
+        self.email_domains.append(self._domains.encode(domain if at else None))
+        self.addresses.append(self._addresses.encode(info.get("address", "")))
+
+    def extend(self, rows: Iterable[Tuple[str, Mapping]]) -> None:
+        for name, info in rows:
+            self.append(name, info)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def email(self, row: int) -> str:
+        domain = self._domains.values[self.email_domains[row]]
+        user = self.email_users[row]
+        return user if domain is None else f"{user}@{domain}"
+
+    def row(self, row: int) -> Tuple[str, Contact]:
+        address = self._addresses.values[self.addresses[row]]
+        return self.names[row], Contact(self.phones[row], self.email(row), address)
+
+    def __iter__(self) -> Iterator[Tuple[str, Contact]]:
+        return (self.row(i) for i in range(len(self.names)))
+
+    def count_by_domain(self) -> Counter:
+        """Number of contacts per email domain (None for emails without "@")."""
+        codes = Counter(self.email_domains)
+        return Counter({self._domains.values[code]: count for code, count in codes.items()})
+
+    def count_by_address(self) -> Counter:
+        """Number of contacts per address."""
+        codes = Counter(self.addresses)
+        return Counter({self._addresses.values[code]: count for code, count in codes.items()})
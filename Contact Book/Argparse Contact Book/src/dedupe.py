@@ -0,0 +1,333 @@
+"""Duplicate detection and merging for the contact book CLI.
+
+Names are the only key of a contact book, so the same person imported
+twice under different spellings ("Jon Smith", "Smith, John") ends up as
+two contacts. `find_duplicates` finds them without comparing every pair
+of contacts:
+
+1. Blocking: every contact gets a few blocking keys (its phone number
+   reduced to its last digits, its email address and the Soundex codes
+   of its name) and only contacts sharing a key are compared. Blocks
+   larger than `max_block` (a shared switchboard number, a very common
+   name) are skipped rather than compared pairwise.
+2. Scoring: each candidate pair gets a score between 0 and 1, the
+   weighted similarity of the names (trigram Dice coefficient) and of
+   the phones and emails present in both contacts.
+3. Clustering: pairs scoring at least `threshold` are grouped with a
+   union-find, so A~B and B~C put A, B and C in one group.
+
+`plan_merges` then picks the contact that survives in each group and the
+fields it ends up with, and `apply_merges` edits the survivors and
+deletes the other contacts in a single storage batch.
+
+Only the Python standard library is required.
+"""
+
+from __future__ import annotations
+
+import gc
+import itertools
+import re
+import time
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple
+
+from search_index import phone_digits, trigrams
+
+FIELDS = ("phone", "email", "address")
+KEEP_POLICIES = ("complete", "longest", "first")
+FIELD_POLICIES = ("fill", "keep")
+
+DEFAULT_THRESHOLD = 0.8
+MAX_BLOCK = 100
+
+# Weight of each field in the score of a pair; phones and emails only
+# count when both contacts have one.
+NAME_WEIGHT = 0.4
+PHONE_WEIGHT = 0.3
+EMAIL_WEIGHT = 0.3
+
+# Phones are compared on their last digits, which drops country codes
+# and trunk prefixes ("+1 555 0100" and "555-0100" match).
+PHONE_KEY_DIGITS = 9
+MIN_PHONE_DIGITS = 6
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+_SOUNDEX_CODES = {
+    letter: digit
+    for letters, digit in (("BFPV", "1"), ("CGJKQSXZ", "2"), ("DT", "3"), ("L", "4"), ("MN", "5"), ("R", "6"))
+    for letter in letters
+}
+
+
+class Merge(NamedTuple):
+    survivor: str
+    merged: Tuple[str, ...]
+    contact: Dict[str, str]
+
+
+class DedupeStats(NamedTuple):
+    contacts: int
+    candidate_pairs: int
+    skipped_blocks: int
+    groups: int
+    duplicates: int
+    seconds: float
+
+
+def clean_name(name: str) -> str:
+    """Fold case and accents, and turn punctuation into spaces."""
+    folded = name.casefold()
+    if not folded.isascii():
+        decomposed = unicodedata.normalize("NFKD", folded)
+        folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD.sub(" ", folded).split())
+
+
+@lru_cache(maxsize=1 << 16)
+def soundex(word: str) -> str:
+    """American Soundex code of `word` ("Robert" -> "R163"), "" if it has no letters."""
+    letters = [ch for ch in word.upper() if "A" <= ch <= "Z"]
+    if not letters:
+        return ""
+    code = [letters[0]]
+    last = _SOUNDEX_CODES.get(letters[0], "")
+    for ch in letters[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != last:
+            code.append(digit)
+            if len(code) == 4:
+                break
+        # Vowels separate equal codes; H and W do not
+        if ch not in "HW":
+            last = digit
+    return "".join(code).ljust(4, "0")
+
+
+def name_key(cleaned: str) -> str:
+    """Soundex codes of the words of a cleaned name, in sorted order.
+
+    Sorting makes the key independent of the word order, so
+    "Smith, John" and "Jon Smyth" share the key of "John Smith".
+    """
+    return " ".join(sorted(filter(None, map(soundex, cleaned.split()))))
+
+
+def phone_key(phone: str) -> str:
+    digits = phone_digits(phone or "")
+    return digits[-PHONE_KEY_DIGITS:] if len(digits) >= MIN_PHONE_DIGITS else ""
+
+
+def email_key(email: str) -> str:
+    """Case-folded address without its "+tag" ("Bob+work@X.com" -> "bob@x.com")."""
+    user, at, domain = (email or "").strip().casefold().rpartition("@")
+    if not at or not user or not domain:
+        return ""
+    return f"{user.split('+', 1)[0]}@{domain}"
+
+
+class _Contacts:
+    """Per-contact keys of a book, addressed by integer ids."""
+
+    def __init__(self, contacts: Mapping[str, Mapping[str, str]]):
+        self.names = list(contacts)
+        self.cleaned = [clean_name(name) for name in self.names]
+        self.phones = [phone_key(info.get("phone", "")) for info in contacts.values()]
+        self.emails = [email_key(info.get("email", "")) for info in contacts.values()]
+        self._grams: Dict[int, frozenset] = {}
+
+    def blocks(self) -> Iterable[List[int]]:
+        """Yield the ids of the contacts sharing each blocking key."""
+        for keys in (self.phones, self.emails, map(name_key, self.cleaned)):
+            block: Dict[str, List[int]] = {}
+            for ident, key in enumerate(keys):
+                if key:
+                    block.setdefault(key, []).append(ident)
+            yield from (ids for ids in block.values() if len(ids) > 1)
+
+    def name_grams(self, ident: int) -> frozenset:
+        grams = self._grams.get(ident)
+        if grams is None:
+            grams = self._grams[ident] = frozenset(trigrams(self.cleaned[ident]))
+        return grams
+
+    def score(self, a: int, b: int, threshold: float = 0.0) -> float:
+        """Score of the pair, or 0.0 once it is clear that it is below `threshold`."""
+        total, weight = 0.0, NAME_WEIGHT
+        for keys, field_weight in ((self.phones, PHONE_WEIGHT), (self.emails, EMAIL_WEIGHT)):
+            if keys[a] and keys[b]:
+                weight += field_weight
+                if keys[a] == keys[b]:
+                    total += field_weight
+        # Most pairs sharing a name key differ in phone and email: skip
+        # the name comparison when even identical names would not do
+        if (total + NAME_WEIGHT) / weight < threshold:
+            return 0.0
+        grams_a, grams_b = self.name_grams(a), self.name_grams(b)
+        name = 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b)) if grams_a or grams_b else 0.0
+        return (total + NAME_WEIGHT * name) / weight
+
+
+def find_duplicates(
+    contacts: Mapping[str, Mapping[str, str]], threshold: float = DEFAULT_THRESHOLD, max_block: int = MAX_BLOCK
+) -> Tuple[List[List[str]], DedupeStats]:
+    """Group the names of `contacts` that likely refer to the same person.
+
+    Returns the groups of two or more names, sorted, and statistics
+    about the search.
+    """
+    start = time.perf_counter()
+    # Millions of small lists and sets would trigger many full
+    # collections that find nothing to free
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        groups, pair_count, skipped = _find_groups(contacts, threshold, max_block)
+    finally:
+        if enabled:
+            gc.enable()
+    stats = DedupeStats(
+        contacts=len(contacts),
+        candidate_pairs=pair_count,
+        skipped_blocks=skipped,
+        groups=len(groups),
+        duplicates=sum(len(group) - 1 for group in groups),
+        seconds=time.perf_counter() - start,
+    )
+    return groups, stats
+
+
+def _find_groups(
+    contacts: Mapping[str, Mapping[str, str]], threshold: float, max_block: int
+) -> Tuple[List[List[str]], int, int]:
+    """Return the groups of duplicates, the number of candidate pairs and of skipped blocks."""
+    book = _Contacts(contacts)
+    # Candidate pairs as a * count + b (a < b), so a pair found through
+    # several keys is scored once
+    count = len(book.names)
+    pairs = set()
+    skipped = 0
+    for ids in book.blocks():
+        if len(ids) > max_block:
+            skipped += 1
+            continue
+        pairs.update(a * count + b for a, b in itertools.combinations(ids, 2))
+
+    parent = list(range(count))
+
+    def find(ident: int) -> int:
+        while parent[ident] != ident:
+            # Path halving keeps the trees flat
+            parent[ident] = ident = parent[parent[ident]]
+        return ident
+
+    for pair in pairs:
+        a, b = divmod(pair, count)
+        if book.score(a, b, threshold) >= threshold:
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    # Roots are the smallest id of their group, so they come first
+    groups: Dict[int, List[str]] = {}
+    for ident in range(count):
+        root = find(ident)
+        if root != ident:
+            groups.setdefault(root, [book.names[root]]).append(book.names[ident])
+    return sorted(sorted(names) for names in groups.values()), len(pairs), skipped
+
+
+def _ranking(policy: str):
+    """Sort key putting the contact that should survive first."""
+    if policy == "complete":
+        return lambda item: (-sum(1 for field in FIELDS if item[1].get(field)), item[0])
+    if policy == "longest":
+        return lambda item: (-len(item[0]), item[0])
+    if policy == "first":
+        return lambda item: item[0]
+    raise ValueError(f"Unknown keep policy: {policy}")
+
+
+def plan_merges(
+    contacts: Mapping[str, Mapping[str, str]], groups: Iterable[List[str]], keep: str = "complete", fields: str = "fill"
+) -> List[Merge]:
+    """Decide how to merge each group of duplicate names.
+
+    `keep` picks the surviving contact: "complete" the one with the most
+    non-empty fields, "longest" the one with the longest name, "first"
+    the first one in name order. `fields` decides what the survivor ends
+    up with: "fill" completes its empty fields from the other contacts
+    (most complete first), "keep" leaves it unchanged.
+    """
+    if fields not in FIELD_POLICIES:
+        raise ValueError(f"Unknown field policy: {fields}")
+    rank = _ranking(keep)
+    merges = []
+    for group in groups:
+        ordered = sorted(((name, contacts[name]) for name in group), key=rank)
+        survivor, info = ordered[0]
+        contact = {field: info.get(field, "") for field in FIELDS}
+        if fields == "fill":
+            for _, other in sorted(ordered[1:], key=_ranking("complete")):
+                for field in FIELDS:
+                    if not contact[field] and other.get(field):
+                        contact[field] = other[field]
+        merges.append(Merge(survivor, tuple(name for name, _ in ordered[1:]), contact))
+    return merges
+
+
+def apply_merges(storage, merges: Iterable[Merge], keep: str = "complete", fields: str = "fill") -> List[Merge]:
+    """Update the survivors and delete the merged contacts in one batch.
+
+    The batch reloads the book if another process changed it since the
+    merges were planned, so every group is planned again inside the
+    batch from the contacts as they are then (with the `keep` and
+    `fields` policies of `plan_merges`): members deleted since are left
+    out, and a group with fewer than two members left is skipped.
+    Returns the merges applied. If anything fails, the whole batch is
+    rolled back.
+    """
+    applied = []
+    with storage.batch():
+        for merge in merges:
+            contacts = {}
+            for name in (merge.survivor, *merge.merged):
+                info = storage.get(name)
+                if info is not None:
+                    contacts[name] = info
+            if len(contacts) < 2:
+                continue
+            survivor, merged, contact = plan_merges(contacts, [list(contacts)], keep, fields)[0]
+            current = contacts[survivor]
+            # edit() only sets non-empty values, so pass just the changes
+            changes = {field: value if value != current.get(field, "") else None for field, value in contact.items()}
+            if any(changes.values()):
+                storage.edit(survivor, changes["phone"], changes["email"], changes["address"])
+            for name in merged:
+                storage.delete(name)
+            applied.append(Merge(survivor, merged, contact))
+    return applied
+
+
+def dedupe(
+    storage,
+    threshold: float = DEFAULT_THRESHOLD,
+    keep: str = "complete",
+    fields: str = "fill",
+    max_block: int = MAX_BLOCK,
+    dry_run: bool = False,
+) -> Tuple[List[Merge], DedupeStats]:
+    """Find the duplicates of `storage` and merge them, unless `dry_run`.
+
+    Returns the merges (as applied, unless `dry_run`) and the statistics
+    of the search, whose group and duplicate counts match the merges.
+    """
+    contacts = storage.list_all()
+    groups, stats = find_duplicates(contacts, threshold, max_block)
+    merges = plan_merges(contacts, groups, keep, fields)
+    if not dry_run:
+        merges = apply_merges(storage, merges, keep, fields)
+        stats = stats._replace(groups=len(merges), duplicates=sum(len(merge.merged) for merge in merges))
+    return merges, stats
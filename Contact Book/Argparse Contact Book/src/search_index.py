@@ -0,0 +1,442 @@
+"""In-memory search index for the contact book.
+
+`SearchIndex` answers three kinds of queries without scanning every
+contact:
+- names: by prefix of the full name or of any word in it (sorted keys
+  searched with `bisect`), then by trigram similarity so that misspelled
+  queries still find their contact
+- phones: by prefix of the digits, ignoring spaces, dashes, parentheses
+  and the leading "+"
+- emails: by full address or by domain ("@example.com" or "example.com")
+
+The index is built once from the contacts and then kept up to date with
+`add` and `discard` as contacts change. The trigram postings are only
+built by the first fuzzy query, since most searches are served by the
+prefix indexes. A fuzzy query scans at most `MAX_POSTINGS` postings,
+taken from its rarest trigrams.
+
+Building the index costs far more than one pass over the contacts, so a
+process answering a single query (a one-shot `contact_cli.py search`)
+uses `scan` instead, which returns the same results without an index.
+Only the Python standard library is required.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+FIELDS = ("name", "phone", "email")
+
+# Fraction of the query trigrams a name must share to be a fuzzy match
+MIN_SIMILARITY = 0.3
+
+# Postings scanned by a fuzzy query at most; the postings of its most
+# common trigrams are replaced by a check of each candidate name.
+MAX_POSTINGS = 100_000
+
+# Removed names leave stale ids in the trigram postings; the postings are
+# rebuilt once there are more stale ids than live ones (and at least this many).
+_MIN_REBUILD = 1024
+
+
+def normalize(text: str) -> str:
+    """Case-fold `text` and collapse its whitespace."""
+    return " ".join(text.casefold().split())
+
+
+def phone_digits(phone: str) -> str:
+    return "".join(filter(str.isdigit, phone))
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the trigrams of the words of `text`, padded so word starts weigh more."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def padded_words(normalized: str) -> str:
+    """Return the words of `normalized`, each padded like in `trigrams`.
+
+    A trigram of a query is in `trigrams(normalized)` exactly when it is
+    a substring of this string, which is much cheaper to test.
+    """
+    return "".join(f"  {word} " for word in normalized.split())
+
+
+def guess_field(query: str) -> str:
+    """Return the field a query searches when none is given.
+
+    Queries containing "@" are emails, queries made only of digits and
+    phone punctuation are phones, anything else is a name.
+    """
+    if "@" in query:
+        return "email"
+    if phone_digits(query) and not query.strip(" +-().0123456789"):
+        return "phone"
+    return "name"
+
+
+def _min_shared(grams: Set[str]) -> int:
+    """Number of the query trigrams a name must share to be a fuzzy match."""
+    return max(1, math.ceil(MIN_SIMILARITY * len(grams)))
+
+
+def scan(rows: Iterable[Tuple[str, str, str]], query: str, limit: int = 10, field: str | None = None) -> List[str]:
+    """Answer `query` like `SearchIndex.search`, in one pass over `rows`.
+
+    `rows` is an iterable of (name, phone, email) tuples, read once.
+    Fuzzy name matches are only looked for if the prefix matches do not
+    fill `limit`, like the index does.
+    """
+    field = field or guess_field(query)
+    if field not in FIELDS:
+        raise ValueError(f"Unknown search field: {field}")
+    if limit <= 0:
+        return []
+    if field == "email":
+        query = query.strip().casefold()
+        emails = ((name, (email or "").strip().casefold()) for name, _, email in rows)
+        if query.startswith("@") or "@" not in query:
+            domain = query.lstrip("@")
+            matches = (name for name, email in emails if "@" in email and email.rpartition("@")[2] == domain)
+        else:
+            matches = (name for name, email in emails if email == query)
+        return heapq.nsmallest(limit, matches)
+    if field == "phone":
+        digits = phone_digits(query)
+        if not digits:
+            return []
+        keys = ((phone_digits(phone or ""), name) for name, phone, _ in rows)
+        return [name for _, name in heapq.nsmallest(limit, (key for key in keys if key[0].startswith(digits)))]
+
+    prefix = normalize(query)
+    if not prefix:
+        return []
+    names = [row[0] for row in rows]
+    folded = list(map(str.casefold, names))
+    # Any name containing the prefix contains its first word unchanged,
+    # a substring test much cheaper than normalizing every name
+    first_word = prefix.split()[0]
+    prefixed: List[Tuple[str, str]] = []  # (first matching key, name)
+    for ident in [ident for ident, text in enumerate(folded) if first_word in text]:
+        normalized = normalize(names[ident])
+        keys = [key for key in [normalized] + normalized.split()[1:] if key.startswith(prefix)]
+        if keys:
+            prefixed.append((min(keys), names[ident]))
+    results = [name for _, name in heapq.nsmallest(limit, prefixed)]
+    if len(results) < limit:
+        exclude = {name for _, name in prefixed}
+        results += _scan_fuzzy(names, folded, prefix, limit - len(results), exclude)
+    return results
+
+
+def _scan_fuzzy(names: List[str], folded: List[str], normalized: str, limit: int, exclude: Set[str]) -> List[str]:
+    """Fuzzy name matches of `normalized`, like `SearchIndex._fuzzy` without postings.
+
+    The case-folded names are padded like in `padded_words` and joined
+    into one string, searched trigram by trigram: the cost depends on
+    the number of occurrences of the query trigrams rather than on the
+    number of contacts. The same `MAX_POSTINGS` bound applies.
+    """
+    padded = ["   ".join(name.split()) for name in folded]
+    text = "  " + " \n  ".join(padded) + " "
+    # Offset of the padded name of every id ("  " + name + " \n")
+    starts = array("q", [0])
+    for name in padded:
+        starts.append(starts[-1] + len(name) + 4)
+    grams = trigrams(normalized)
+    needed = _min_shared(grams)
+    counts = {gram: text.count(gram) for gram in grams}
+    shared_counts: Counter = Counter()
+    scanned = 0
+    unscanned = []
+    # Rarest trigrams first
+    for gram in sorted(grams, key=counts.__getitem__):
+        if scanned and scanned + counts[gram] > MAX_POSTINGS:
+            unscanned.append(gram)
+            continue
+        scanned += counts[gram]
+        positions = [match.start() for match in re.finditer(re.escape(gram), text)]
+        shared_counts.update({bisect_right(starts, position) - 1 for position in positions})
+    scored = []
+    for ident, shared in shared_counts.items():
+        if shared + len(unscanned) < needed:
+            continue
+        name = names[ident]
+        if name in exclude:
+            continue
+        words = "  " + padded[ident] + " "
+        if unscanned:
+            shared += sum(gram in words for gram in unscanned)
+            if shared < needed:
+                continue
+        # Dice coefficient, negated so that equal scores come in name order
+        gram_count = len(trigrams(normalize(name)))
+        scored.append((-2 * shared / (len(grams) + min(gram_count, 0xFFFF)), name))
+    return [name for _, name in heapq.nsmallest(limit, scored)]
+
+
+class _SortedKeys:
+    """Sorted (key, name) pairs, stored as a list of sorted blocks.
+
+    A single sorted list would move up to millions of pointers on every
+    insert or removal; blocks bound that to `BLOCK_SIZE` while keeping
+    lookups a pair of bisections.
+    """
+
+    BLOCK_SIZE = 1000
+
+    def __init__(self, items: Iterable[Tuple[str, str]] = ()):
+        items = sorted(items)
+        size = self.BLOCK_SIZE
+        self._blocks = [items[i:i + size] for i in range(0, len(items), size)]
+        self._maxes = [block[-1] for block in self._blocks]
+
+    def add(self, item: Tuple[str, str]) -> None:
+        if not self._blocks:
+            self._blocks.append([item])
+            self._maxes.append(item)
+            return
+        i = bisect_left(self._maxes, item)
+        if i == len(self._blocks):
+            i -= 1
+            self._blocks[i].append(item)
+            self._maxes[i] = item
+        else:
+            insort(self._blocks[i], item)
+        block = self._blocks[i]
+        if len(block) > 2 * self.BLOCK_SIZE:
+            half = len(block) // 2
+            self._blocks[i:i + 1] = [block[:half], block[half:]]
+            self._maxes[i:i + 1] = [block[half - 1], block[-1]]
+
+    def remove(self, item: Tuple[str, str]) -> None:
+        i = bisect_left(self._maxes, item)
+        if i == len(self._blocks):
+            return
+        block = self._blocks[i]
+        j = bisect_left(block, item)
+        if j == len(block) or block[j] != item:
+            return
+        del block[j]
+        if not block:
+            del self._blocks[i]
+            del self._maxes[i]
+        elif j == len(block):
+            self._maxes[i] = block[-1]
+
+    def prefixed(self, prefix: str) -> Iterator[str]:
+        """Yield the names whose key starts with `prefix`, in key order."""
+        start = (prefix,)
+        i = bisect_left(self._maxes, start)
+        j = bisect_left(self._blocks[i], start) if i < len(self._blocks) else 0
+        for block in self._blocks[i:]:
+            for key, name in block[j:]:
+                if not key.startswith(prefix):
+                    return
+                yield name
+            j = 0
+
+
+class SearchIndex:
+    """Name, phone and email index over a mapping of name -> contact info.
+
+    Every query returns at most `limit` names, best matches first, in
+    time that depends on the number of matches rather than on the size
+    of the contact book.
+    """
+
+    def __init__(self, contacts: Dict[str, Dict[str, str]] | None = None):
+        self.build(contacts or {})
+
+    def build(self, contacts: Dict[str, Dict[str, str]]) -> None:
+        """Index `contacts` from scratch, replacing the current content."""
+        name_keys: List[Tuple[str, str]] = []
+        phone_keys: List[Tuple[str, str]] = []
+        self._emails: Dict[str, Set[str]] = {}
+        self._domains: Dict[str, Set[str]] = {}
+        # name -> (name keys, phone digits, email), to undo the indexing
+        self._entries: Dict[str, Tuple[Tuple[str, ...], str, str]] = {}
+        for name, info in contacts.items():
+            keys, digits, email = entry = self._keys(name, info)
+            name_keys.extend((key, name) for key in keys)
+            if digits:
+                phone_keys.append((digits, name))
+            self._index_email(name, email)
+            self._entries[name] = entry
+        # Sorting once is much faster than inserting 1M keys one by one
+        self._name_keys = _SortedKeys(name_keys)  # (normalized name or word, name)
+        self._phone_keys = _SortedKeys(phone_keys)  # (phone digits, name)
+        # Built on demand by _build_trigrams
+        self._trigrams: Dict[str, array] | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    @staticmethod
+    def _keys(name: str, info: Dict[str, str]) -> Tuple[Tuple[str, ...], str, str]:
+        normalized = normalize(name)
+        # The full name, then every later word, so "smi" finds "John Smith"
+        keys = tuple(dict.fromkeys([normalized] + normalized.split()[1:]))
+        digits = phone_digits(info.get("phone") or "")
+        email = (info.get("email") or "").strip().casefold()
+        return keys, digits, email
+
+    def _index_email(self, name: str, email: str) -> None:
+        if email:
+            self._emails.setdefault(email, set()).add(name)
+            if "@" in email:
+                self._domains.setdefault(email.rpartition("@")[2], set()).add(name)
+
+    def _build_trigrams(self) -> None:
+        self._trigrams = {}  # trigram -> ids of the names containing it
+        self._ids: Dict[str, int] = {}
+        self._names: List[str | None] = []  # id -> name, None once discarded
+        self._gram_counts = array("H")  # id -> number of trigrams of the name
+        self._stale = 0
+        for name, (keys, _, _) in self._entries.items():
+            self._add_trigrams(name, keys[0])
+
+    def _add_trigrams(self, name: str, normalized: str) -> None:
+        ident = len(self._names)
+        grams = trigrams(normalized)
+        self._names.append(name)
+        self._ids[name] = ident
+        self._gram_counts.append(min(len(grams), 0xFFFF))
+        for gram in grams:
+            postings = self._trigrams.get(gram)
+            if postings is None:
+                postings = self._trigrams[gram] = array("i")
+            postings.append(ident)
+
+    def add(self, name: str, info: Dict[str, str]) -> None:
+        """Index (or re-index) the contact `name`."""
+        self.discard(name)
+        keys, digits, email = entry = self._keys(name, info)
+        for key in keys:
+            self._name_keys.add((key, name))
+        if digits:
+            self._phone_keys.add((digits, name))
+        self._index_email(name, email)
+        if self._trigrams is not None:
+            self._add_trigrams(name, keys[0])
+        self._entries[name] = entry
+
+    def discard(self, name: str) -> None:
+        """Remove the contact `name` from the index, if present."""
+        entry = self._entries.pop(name, None)
+        if entry is None:
+            return
+        keys, digits, email = entry
+        for key in keys:
+            self._name_keys.remove((key, name))
+        if digits:
+            self._phone_keys.remove((digits, name))
+        if email:
+            for mapping, key in ((self._emails, email), (self._domains, email.rpartition("@")[2])):
+                names = mapping.get(key)
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del mapping[key]
+        if self._trigrams is None:
+            return
+        # Postings are append-only arrays: mark the id stale instead
+        self._names[self._ids.pop(name)] = None
+        self._stale += 1
+        if self._stale > max(len(self._ids), _MIN_REBUILD):
+            self._build_trigrams()
+
+    def search_name(self, query: str, limit: int = 10) -> List[str]:
+        """Names starting with `query` (or with a word starting with it), then fuzzy matches."""
+        prefix = normalize(query)
+        if not prefix or limit <= 0:
+            return []
+        results: Dict[str, None] = {}
+        for name in self._name_keys.prefixed(prefix):
+            results[name] = None
+            if len(results) >= limit:
+                return list(results)
+        results.update(dict.fromkeys(self._fuzzy(prefix, limit - len(results), results)))
+        return list(results)
+
+    def _fuzzy(self, normalized: str, limit: int, exclude) -> List[str]:
+        if self._trigrams is None:
+            self._build_trigrams()
+        grams = trigrams(normalized)
+        needed = _min_shared(grams)
+        # Count, for every name, how many of the query trigrams it shares;
+        # Counter does the counting in C over the postings arrays. The
+        # rarest trigrams come first, and once MAX_POSTINGS would be
+        # exceeded the remaining (common) trigrams are checked on the
+        # candidate names instead of scanning their postings.
+        postings = sorted(((self._trigrams.get(gram, ()), gram) for gram in grams), key=lambda item: len(item[0]))
+        shared_counts: Counter = Counter()
+        scanned = 0
+        unscanned = []
+        for ids, gram in postings:
+            if scanned and scanned + len(ids) > MAX_POSTINGS:
+                unscanned.append(gram)
+            else:
+                shared_counts.update(ids)
+                scanned += len(ids)
+        scored = []
+        for ident, shared in shared_counts.items():
+            if shared + len(unscanned) < needed:
+                continue
+            name = self._names[ident]
+            if name is None or name in exclude:
+                continue
+            if unscanned:
+                text = padded_words(self._entries[name][0][0])
+                shared += sum(gram in text for gram in unscanned)
+                if shared < needed:
+                    continue
+            # Dice coefficient (1.0 for identical trigram sets), negated so
+            # that equal scores come in name order
+            scored.append((-2 * shared / (len(grams) + self._gram_counts[ident]), name))
+        return [name for _, name in heapq.nsmallest(limit, scored)]
+
+    def search_phone(self, query: str, limit: int = 10) -> List[str]:
+        """Names whose phone digits start with the digits of `query`."""
+        digits = phone_digits(query)
+        if not digits or limit <= 0:
+            return []
+        results = []
+        for name in self._phone_keys.prefixed(digits):
+            results.append(name)
+            if len(results) >= limit:
+                break
+        return results
+
+    def search_email(self, query: str, limit: int = 10) -> List[str]:
+        """Names with the email address `query`, or with an address in the domain `query`."""
+        query = query.strip().casefold()
+        if query.startswith("@") or "@" not in query:
+            names = self._domains.get(query.lstrip("@"), ())
+        else:
+            names = self._emails.get(query, ())
+        return heapq.nsmallest(limit, names)
+
+    def search(self, query: str, limit: int = 10, field: str | None = None) -> List[str]:
+        """Search `field`, or guess it from the query when `field` is None (see `guess_field`)."""
+        field = field or guess_field(query)
+        if field == "name":
+            return self.search_name(query, limit)
+        if field == "phone":
+            return self.search_phone(query, limit)
+        if field == "email":
+            return self.search_email(query, limit)
+        raise ValueError(f"Unknown search field: {field}")
@@ -0,0 +1,400 @@
+"""Long-running contact service for the contact book CLI.
+
+`serve` keeps a storage backend loaded in memory and answers requests on
+a Unix socket, so a lookup no longer pays for interpreter startup and a
+full load of the book. The protocol is one JSON object per line in each
+direction:
+
+    {"op": "get", "name": "Alice"}
+    {"ok": true, "result": {"phone": "...", "email": "...", "address": "..."}}
+
+    {"op": "add", "name": "Bob", "phone": "...", "email": "...", "address": "..."}
+    {"ok": false, "error": "Contact already exists"}
+
+Operations: ping, get, search, list, add, edit, delete, apply (a list of
+add/edit/delete requests applied atomically) and flush. `list` streams
+its rows as several response lines, the last one with `"more": false`.
+
+asyncio serves many clients concurrently on a single thread, so writes
+are naturally serialized. Writes are applied in memory at once and
+persisted with write-behind batching: the first write opens a storage
+batch, which is committed `flush_interval` seconds later, so a burst of
+writes costs a single save. The save runs in a worker thread, so reads
+go on meanwhile; writes wait for it to finish. A write is acknowledged
+before it reaches the disk. If the save fails, the batch is rolled back
+and its writes are applied again in a new batch, saved after a growing
+delay, so acknowledged writes are kept until the disk accepts them.
+Pending writes are flushed when the service stops.
+
+`RemoteStorage` is a client with the same interface as the storages and
+`connect` returns one when a service is running for a given book, which
+is how the CLI subcommands use the service automatically.
+
+Unix sockets are required, so the service is not available on Windows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import os
+import signal
+import socket
+import sys
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+SOCKET_SUFFIX = ".sock"
+FLUSH_INTERVAL = 0.05
+# Longest delay between two attempts to save after a failed save
+MAX_RETRY_INTERVAL = 5.0
+# Rows per response line when streaming `list`
+PAGE_SIZE = 1000
+# Requests are single lines, and an `apply` from a large import can be big
+MAX_LINE = 1 << 30
+
+WRITE_OPS = ("add", "edit", "delete")
+
+
+def socket_path_for(storage_path: str) -> str:
+    """Return the socket of the service serving the book at `storage_path`."""
+    return storage_path + SOCKET_SUFFIX
+
+
+def _encode(response: dict) -> bytes:
+    # `default=dict` encodes the Contact records of the JSON storages
+    return json.dumps(response, ensure_ascii=False, default=dict).encode("utf-8") + b"\n"
+
+
+class ContactServer:
+    """Serves a storage over a Unix socket with write-behind batching."""
+
+    def __init__(self, storage, socket_path: str, flush_interval: float = FLUSH_INTERVAL):
+        self.storage = storage
+        self.socket_path = socket_path
+        self.flush_interval = flush_interval
+        self.writes = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self._batch = None  # storage batch holding the writes not yet persisted
+        self._unsaved: List[dict] = []  # the write requests applied in `_batch`
+        self._flush_handle = None
+        self._retry_interval = flush_interval
+        # Held by writes and saves: the storage only changes on the loop
+        # thread, and never while a save runs in the worker thread
+        self._write_lock = asyncio.Lock()
+
+    def _apply(self, request: dict) -> None:
+        op = request.get("op")
+        if op not in WRITE_OPS:
+            raise ValueError(f"Unknown write operation: {op}")
+        args = {key: value for key, value in request.items() if key != "op"}
+        getattr(self.storage, op)(**args)
+
+    def _begin_batch(self, delay: float) -> None:
+        if self._batch is None:
+            self._batch = self.storage.batch()
+            self._batch.__enter__()
+            self._flush_handle = asyncio.get_running_loop().call_later(delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        asyncio.ensure_future(self._scheduled_flush())
+
+    async def _scheduled_flush(self) -> None:
+        try:
+            await self.flush()
+        except OSError:
+            # Reported by flush, which already scheduled the next attempt
+            pass
+
+    async def _commit(self, batch) -> None:
+        """Save `batch` in a worker thread; the storage rolls it back if that fails."""
+        await asyncio.get_running_loop().run_in_executor(None, batch.__exit__, None, None, None)
+
+    async def flush(self) -> None:
+        """Persist the pending writes, if any.
+
+        Raises `OSError` if they could not be saved; they are then kept
+        in a new batch and saved again later.
+        """
+        async with self._write_lock:
+            await self._flush_locked()
+
+    async def _flush_locked(self) -> None:
+        """Like `flush`, with `_write_lock` already held."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._batch = self._batch, None
+        if batch is None:
+            return
+        unsaved, self._unsaved = self._unsaved, []
+        try:
+            await self._commit(batch)
+        except OSError as exc:
+            self.failed_flushes += 1
+            self._retry_interval = min(2 * self._retry_interval, MAX_RETRY_INTERVAL)
+            print(
+                f"Error: could not save the contact book, retrying in {self._retry_interval:g}s: {exc}",
+                file=sys.stderr,
+            )
+            self._reapply(unsaved)
+            raise
+        self.flushes += 1
+        self._retry_interval = self.flush_interval
+
+    def _reapply(self, requests: List[dict]) -> None:
+        """Apply the writes of a batch that could not be saved to a new batch."""
+        self._begin_batch(self._retry_interval)
+        for request in requests:
+            try:
+                self._apply(request)
+            except ValueError as exc:
+                # Only if another process changed the book in between
+                print(f"Error: dropped the unsaved write {request}: {exc}", file=sys.stderr)
+                continue
+            self._unsaved.append(request)
+
+    async def _write(self, request: dict) -> None:
+        async with self._write_lock:
+            self._begin_batch(self.flush_interval)
+            self._apply(request)
+            self._unsaved.append(request)
+            self.writes += 1
+
+    async def _apply_atomically(self, requests: List[dict]) -> int:
+        """Apply and save `requests` in their own batch, before answering."""
+        async with self._write_lock:
+            # The pending writes come first; if they cannot be saved, neither can these.
+            # Both happen under one lock, so no write can open a batch in between.
+            await self._flush_locked()
+            batch = self.storage.batch()
+            batch.__enter__()
+            try:
+                for change in requests:
+                    self._apply(change)
+            except BaseException:
+                if not batch.__exit__(*sys.exc_info()):
+                    raise
+            await self._commit(batch)
+            self.writes += len(requests)
+            self.flushes += 1
+        return len(requests)
+
+    async def _dispatch(self, request: dict):
+        op = request.get("op")
+        if op == "ping":
+            return {"writes": self.writes, "flushes": self.flushes, "failed_flushes": self.failed_flushes}
+        if op == "get":
+            return self.storage.get(request["name"])
+        if op == "search":
+            return self.storage.search(request["query"], request.get("limit", 10), request.get("field"))
+        if op in WRITE_OPS:
+            await self._write(request)
+            return None
+        if op == "apply":
+            return await self._apply_atomically(request["ops"])
+        if op == "flush":
+            await self.flush()
+            return None
+        raise ValueError(f"Unknown operation: {op}")
+
+    async def _stream_list(self, request: dict, writer) -> None:
+        rows = self.storage.iter_sorted(request.get("after"), request.get("limit"))
+        while True:
+            page = [[name, info] for name, info in itertools.islice(rows, PAGE_SIZE)]
+            more = len(page) == PAGE_SIZE
+            writer.write(_encode({"ok": True, "rows": page, "more": more}))
+            await writer.drain()
+            if not more:
+                return
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if request.get("op") == "list":
+                        await self._stream_list(request, writer)
+                        continue
+                    response = {"ok": True, "result": await self._dispatch(request)}
+                except KeyError as exc:
+                    response = {"ok": False, "error": f"Missing field {exc}"}
+                except (ValueError, TypeError, AttributeError) as exc:
+                    response = {"ok": False, "error": str(exc)}
+                except OSError as exc:
+                    response = {"ok": False, "error": f"Could not save the contact book: {exc}"}
+                writer.write(_encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def run(self) -> None:
+        """Serve until SIGINT or SIGTERM, then flush and remove the socket."""
+        if os.path.exists(self.socket_path):
+            probe = connect_socket(self.socket_path)
+            if probe is not None:
+                probe.close()
+                raise ValueError(f"A contact service is already running on {self.socket_path}")
+            # Left behind by a service that did not stop cleanly
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path, limit=MAX_LINE)
+        print(f"Serving on {self.socket_path} (Ctrl+C to stop)", flush=True)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            os.unlink(self.socket_path)
+            try:
+                await self.flush()
+            except OSError:
+                print(f"Error: {len(self._unsaved)} writes were not saved", file=sys.stderr)
+
+
+def serve(storage, socket_path: str, flush_interval: float = FLUSH_INTERVAL) -> ContactServer:
+    """Run a `ContactServer` for `storage` until it is stopped."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError("The contact service needs Unix sockets, which this platform does not support")
+    server = ContactServer(storage, socket_path, flush_interval)
+    asyncio.run(server.run())
+    return server
+
+
+class RemoteStorage:
+    """Client of a running contact service, with the storage interface.
+
+    Errors reported by the service are raised as `ValueError`, like the
+    local storages do.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+        # Changes buffered by batch(), and the contacts they produce (None if deleted)
+        self._pending: List[dict] | None = None
+        self._overlay: Dict[str, Dict[str, str] | None] | None = None
+
+    def _send(self, request: dict) -> None:
+        self._file.write(_encode(request))
+        self._file.flush()
+
+    def _receive(self) -> dict:
+        line = self._file.readline()
+        if not line:
+            raise ValueError("The contact service closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        return response
+
+    def _call(self, request: dict):
+        self._send(request)
+        return self._receive()["result"]
+
+    def _write(self, request: dict, contact: Dict[str, str] | None) -> None:
+        if self._pending is None:
+            self._call(request)
+        else:
+            self._pending.append(request)
+            self._overlay[request["name"]] = contact
+
+    @contextmanager
+    def batch(self):
+        """Buffer changes and send them as one request, applied atomically.
+
+        Nothing is sent if the block raises.
+        """
+        self._pending, self._overlay = [], {}
+        try:
+            yield self
+            if self._pending:
+                self._call({"op": "apply", "ops": self._pending})
+        finally:
+            self._pending = self._overlay = None
+
+    def add(self, name: str, phone: str, email: str, address: str) -> None:
+        contact = {"phone": phone, "email": email, "address": address}
+        if self._pending is not None and self.get(name) is not None:
+            raise ValueError("Contact already exists")
+        self._write({"op": "add", "name": name, **contact}, contact)
+
+    def edit(self, name: str, phone: str | None, email: str | None, address: str | None) -> None:
+        contact = None
+        if self._pending is not None:
+            current = self.get(name)
+            if current is None:
+                raise ValueError("Contact not found")
+            contact = dict(current)
+            for field, value in (("phone", phone), ("email", email), ("address", address)):
+                if value:
+                    contact[field] = value
+        self._write({"op": "edit", "name": name, "phone": phone, "email": email, "address": address}, contact)
+
+    def delete(self, name: str) -> None:
+        if self._pending is not None and self.get(name) is None:
+            raise ValueError("Contact not found")
+        self._write({"op": "delete", "name": name}, None)
+
+    def get(self, name: str) -> Dict[str, str] | None:
+        if self._overlay is not None and name in self._overlay:
+            return self._overlay[name]
+        return self._call({"op": "get", "name": name})
+
+    def search(self, query: str, limit: int = 10, field: str | None = None) -> List[str]:
+        return self._call({"op": "search", "query": query, "limit": limit, "field": field})
+
+    def iter_sorted(self, after: str | None = None, limit: int | None = None) -> Iterator[Tuple[str, Dict[str, str]]]:
+        self._send({"op": "list", "after": after, "limit": limit})
+        more = True
+        while more:
+            response = self._receive()
+            more = response["more"]
+            try:
+                for name, info in response["rows"]:
+                    yield name, info
+            except GeneratorExit:
+                # The caller stopped early: read the rest of the stream
+                while more:
+                    more = self._receive()["more"]
+                raise
+
+    def list_all(self) -> Dict[str, Dict[str, str]]:
+        return dict(self.iter_sorted())
+
+    def ping(self) -> dict:
+        return self._call({"op": "ping"})
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+
+def connect_socket(socket_path: str, timeout: float = 5.0) -> socket.socket | None:
+    """Connect to the service socket, or return None if nothing listens on it."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def connect(storage_path: str) -> RemoteStorage | None:
+    """Return a client for the service of the book at `storage_path`, if one is running."""
+    socket_path = socket_path_for(storage_path)
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    sock = connect_socket(socket_path)
+    return RemoteStorage(sock) if sock is not None else None
@@ -0,0 +1,188 @@
+"""SQLite storage backend for the contact book CLI.
+
+`SQLiteContactStorage` exposes the same add/edit/delete/get/list_all/
+iter_sorted/search interface as the JSON-backed `ContactBookStorage`, but every operation
+touches a single row through the primary-key index instead of loading
+and rewriting the whole book. The database runs in WAL mode so readers
+never block the writer.
+
+Only the Python standard library (`sqlite3`) is required.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+DB_FILE = os.path.join(os.path.dirname(__file__), "contacts.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    name TEXT PRIMARY KEY,
+    phone TEXT NOT NULL,
+    email TEXT NOT NULL,
+    address TEXT NOT NULL
+) WITHOUT ROWID
+"""
+
+# Statements are kept as constants so sqlite3 reuses the prepared
+# statements from its per-connection cache.
+_INSERT = "INSERT INTO contacts (name, phone, email, address) VALUES (?, ?, ?, ?)"
+_UPSERT = "INSERT OR REPLACE INTO contacts (name, phone, email, address) VALUES (?, ?, ?, ?)"
+_UPDATE = (
+    "UPDATE contacts SET phone = COALESCE(?, phone), email = COALESCE(?, email), "
+    "address = COALESCE(?, address) WHERE name = ?"
+)
+_DELETE = "DELETE FROM contacts WHERE name = ?"
+_SELECT_ONE = "SELECT phone, email, address FROM contacts WHERE name = ?"
+_SELECT_SEARCH = "SELECT name, phone, email FROM contacts"
+_SELECT_ALL = "SELECT name, phone, email, address FROM contacts ORDER BY name"
+# LIMIT -1 means no limit; both queries walk the primary-key index
+_SELECT_FIRST_PAGE = "SELECT name, phone, email, address FROM contacts ORDER BY name LIMIT ?"
+_SELECT_PAGE = "SELECT name, phone, email, address FROM contacts WHERE name > ? ORDER BY name LIMIT ?"
+
+
+class SQLiteContactStorage:
+    """SQLite-backed storage for contacts.
+
+    Drop-in replacement for `ContactBookStorage`: the same methods, the
+    same return values and the same `ValueError` messages.
+    """
+
+    def __init__(self, path: str = DB_FILE):
+        self.path = path
+        self._in_batch = False
+        # SearchIndex built by the second search, then updated on every change
+        self._index = None
+        self._searched = False
+        # The contact service commits from a worker thread, one
+        # transaction at a time
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps the database consistent with NORMAL sync; only the
+        # last transactions may be lost on power failure.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def _execute(self, sql: str, params: tuple) -> sqlite3.Cursor:
+        """Run a write statement, committing it unless a batch is open."""
+        if self._in_batch:
+            return self._conn.execute(sql, params)
+        with self._conn:
+            return self._conn.execute(sql, params)
+
+    @contextmanager
+    def batch(self):
+        """Group changes into one transaction, rolled back on error."""
+        self._in_batch = True
+        try:
+            with self._conn:
+                yield self
+        except BaseException:
+            # The index may hold changes that were just rolled back
+            self._index = None
+            raise
+        finally:
+            self._in_batch = False
+
+    def add(self, name: str, phone: str, email: str, address: str) -> None:
+        try:
+            self._execute(_INSERT, (name, phone, email, address))
+        except sqlite3.IntegrityError:
+            raise ValueError("Contact already exists") from None
+        if self._index is not None:
+            self._index.add(name, {"phone": phone, "email": email, "address": address})
+
+    def edit(self, name: str, phone: str | None, email: str | None, address: str | None) -> None:
+        # Empty values leave the field unchanged, like the JSON storage
+        cursor = self._execute(_UPDATE, (phone or None, email or None, address or None, name))
+        if cursor.rowcount == 0:
+            raise ValueError("Contact not found")
+        if self._index is not None:
+            self._index.add(name, self.get(name))
+
+    def delete(self, name: str) -> None:
+        cursor = self._execute(_DELETE, (name,))
+        if cursor.rowcount == 0:
+            raise ValueError("Contact not found")
+        if self._index is not None:
+            self._index.discard(name)
+
+    def list_all(self) -> Dict[str, Dict[str, str]]:
+        return {
+            name: {"phone": phone, "email": email, "address": address}
+            for name, phone, email, address in self._conn.execute(_SELECT_ALL)
+        }
+
+    def iter_sorted(self, after: str | None = None, limit: int | None = None) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """Yield (name, info) pairs in name order, starting after the name `after`.
+
+        Rows are streamed from the cursor, so memory does not grow with
+        the size of the book.
+        """
+        limit = -1 if limit is None else limit
+        if after is None:
+            rows = self._conn.execute(_SELECT_FIRST_PAGE, (limit,))
+        else:
+            rows = self._conn.execute(_SELECT_PAGE, (after, limit))
+        for name, phone, email, address in rows:
+            yield name, {"phone": phone, "email": email, "address": address}
+
+    def get(self, name: str) -> Dict[str, str] | None:
+        row = self._conn.execute(_SELECT_ONE, (name,)).fetchone()
+        if row is None:
+            return None
+        phone, email, address = row
+        return {"phone": phone, "email": email, "address": address}
+
+    def search(self, query: str, limit: int = 10, field: str | None = None) -> List[str]:
+        """Return up to `limit` names matching `query`, best matches first.
+
+        As with the JSON storage, the first search streams the rows
+        through `scan` and the next one builds the index.
+        """
+        if self._index is None:
+            if not self._searched:
+                from search_index import scan
+
+                self._searched = True
+                return scan(self._conn.execute(_SELECT_SEARCH), query, limit, field)
+            from search_index import SearchIndex
+
+            self._index = SearchIndex(self.list_all())
+        return self._index.search(query, limit, field)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def migrate_json(json_path: str, db_path: str = DB_FILE) -> int:
+    """Copy every contact of a JSON contact book into a SQLite database.
+
+    Contacts already present in the database are overwritten, so the
+    migration can safely be re-run. Changes still in the journal of the
+    book (`--backend journal`) are included. Returns the number of
+    contacts copied.
+    """
+    from contact_cli import ContactBookStorage
+
+    if not os.path.exists(json_path) and not os.path.exists(json_path + ".journal"):
+        raise FileNotFoundError(f"No contact book at {json_path}")
+    # Loads the snapshot and replays the journal under the shared lock
+    data = ContactBookStorage(json_path, cache=False).list_all()
+    storage = SQLiteContactStorage(db_path)
+    try:
+        with storage._conn:
+            storage._conn.executemany(
+                _UPSERT,
+                (
+                    (name, info.get("phone", ""), info.get("email", ""), info.get("address", ""))
+                    for name, info in data.items()
+                ),
+            )
+    finally:
+        storage.close()
+    return len(data)
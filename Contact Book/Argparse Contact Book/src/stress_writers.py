@@ -0,0 +1,83 @@
+"""Stress test for concurrent writers of the JSON contact book.
+
+Starts several processes that add and then edit contacts in the same
+file at the same time, and checks that no update was lost. Each process
+keeps its storage open for the whole run, so most of its writes start
+from a stale copy of the book and go through the reload-and-retry path.
+
+Usage:
+
+    python stress_writers.py --processes 8 --operations 100
+    python stress_writers.py --backend journal
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from contact_cli import ContactBookStorage, JournaledContactStorage
+
+BACKENDS = {"json": ContactBookStorage, "journal": JournaledContactStorage}
+
+
+def _writer(backend: str, path: str, worker: int, operations: int, start) -> None:
+    storage = BACKENDS[backend](path)
+    start.wait()
+    try:
+        for i in range(operations):
+            storage.add(f"worker{worker}-{i}", "new", f"w{worker}@example.com", "")
+        for i in range(operations):
+            storage.edit(f"worker{worker}-{i}", f"{worker}-{i}", None, None)
+    finally:
+        storage.close()
+
+
+def run(backend: str, processes: int, operations: int) -> bool:
+    """Run the stress test in a temporary directory and report lost updates."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "contacts.json")
+        start = multiprocessing.Barrier(processes)
+        workers = [
+            multiprocessing.Process(target=_writer, args=(backend, path, worker, operations, start))
+            for worker in range(processes)
+        ]
+        began = time.perf_counter()
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+        elapsed = time.perf_counter() - began
+
+        storage = BACKENDS[backend](path)
+        data = storage.list_all()
+        storage.close()
+
+    crashed = sum(process.exitcode != 0 for process in workers)
+    expected = {f"worker{w}-{i}": f"{w}-{i}" for w in range(processes) for i in range(operations)}
+    missing = [name for name in expected if name not in data]
+    stale = [name for name, phone in expected.items() if name in data and data[name]["phone"] != phone]
+    writes = 2 * processes * operations
+    print(f"{backend}: {writes} writes by {processes} processes in {elapsed:.2f}s ({writes / elapsed:,.0f} writes/s)")
+    print(f"  contacts: {len(data)} / {len(expected)}, missing adds: {len(missing)}, "
+          f"lost edits: {len(stale)}, crashed writers: {crashed}")
+    return not (missing or stale or crashed)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Concurrent writer stress test for the JSON contact book")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="json")
+    parser.add_argument("--processes", type=int, default=8, help="Number of writer processes (default: 8)")
+    parser.add_argument("--operations", type=int, default=100, help="Contacts added and edited per process (default: 100)")
+    args = parser.parse_args(argv)
+    ok = run(args.backend, args.processes, args.operations)
+    print("OK: no update lost" if ok else "FAILED: updates were lost")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Bulk import and export of contacts for the contact book CLI.
+
+Supported file formats:
+- ``csv``: header row with ``name,phone,email,address`` columns
+- ``jsonl``: one JSON object per line with the same keys
+- ``vcard``: vCard 3.0 (``FN``, ``TEL``, ``EMAIL`` and ``ADR`` properties)
+
+Readers and writers stream records one at a time, and imports run in a
+single storage batch so the contact book is persisted once at the end.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, NamedTuple, Tuple
+
+FIELDS = ("phone", "email", "address")
+FORMATS = ("csv", "jsonl", "vcard")
+DUPLICATE_POLICIES = ("skip", "overwrite", "merge")
+
+_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".vcf": "vcard", ".vcard": "vcard"}
+
+Record = Tuple[str, Dict[str, str]]
+
+
+class ImportStats(NamedTuple):
+    added: int
+    updated: int
+    skipped: int
+    seconds: float
+
+    @property
+    def records_per_second(self) -> float:
+        total = self.added + self.updated + self.skipped
+        return total / self.seconds if self.seconds else float(total)
+
+
+def detect_format(path: str) -> str:
+    """Guess the file format from the extension of `path`."""
+    fmt = _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Cannot guess the format of {path}; use --format")
+    return fmt
+
+
+@contextmanager
+def _open(path: str, mode: str):
+    """Open `path` for text I/O, with "-" meaning stdin/stdout."""
+    if path == "-":
+        yield sys.stdin if mode == "r" else sys.stdout
+        return
+    with open(path, mode, encoding="utf-8", newline="") as fh:
+        yield fh
+
+
+def _text(value) -> str:
+    """Coerce a cell to stripped text; numbers and booleans keep their repr."""
+    return "" if value is None else str(value).strip()
+
+
+def _clean(info: Dict[str, str]) -> Dict[str, str]:
+    return {field: _text(info.get(field)) for field in FIELDS}
+
+
+def read_csv(fh) -> Iterator[Record]:
+    for row in csv.DictReader(fh):
+        name = _text(row.get("name"))
+        if name:
+            yield name, _clean(row)
+
+
+def read_jsonl(fh) -> Iterator[Record]:
+    for number, line in enumerate(fh, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise ValueError(f"Invalid JSON on line {number}") from None
+        if not isinstance(row, dict):
+            raise ValueError(f"Expected a JSON object on line {number}")
+        name = _text(row.get("name"))
+        if name:
+            yield name, _clean(row)
+
+
+def _vcard_unescape(value: str) -> str:
+    return value.replace("\\n", "\n").replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
+
+
+def _vcard_lines(fh) -> Iterator[str]:
+    """Yield logical vCard lines, joining folded continuation lines."""
+    current = None
+    for raw in fh:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def read_vcard(fh) -> Iterator[Record]:
+    card: Dict[str, str] = {}
+    for line in _vcard_lines(fh):
+        key, _, value = line.partition(":")
+        # Drop parameters such as TEL;TYPE=cell and group prefixes such as item1.EMAIL
+        prop = key.split(";", 1)[0].rsplit(".", 1)[-1].upper()
+        if prop == "BEGIN":
+            card = {}
+        elif prop == "END":
+            name = card.pop("name", "").strip()
+            if name:
+                yield name, _clean(card)
+        elif prop == "FN":
+            card["name"] = _vcard_unescape(value)
+        elif prop == "TEL":
+            card.setdefault("phone", _vcard_unescape(value))
+        elif prop == "EMAIL":
+            card.setdefault("email", _vcard_unescape(value))
+        elif prop == "ADR":
+            # ADR components: PO box;extended;street;city;region;postcode;country
+            parts = [_vcard_unescape(part).strip() for part in value.split(";")]
+            card.setdefault("address", ", ".join(part for part in parts if part))
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "vcard": read_vcard}
+
+
+def write_csv(fh, records: Iterable[Record]) -> int:
+    writer = csv.writer(fh)
+    writer.writerow(("name",) + FIELDS)
+    count = 0
+    for name, info in records:
+        writer.writerow((name,) + tuple(info.get(field, "") for field in FIELDS))
+        count += 1
+    return count
+
+
+def write_jsonl(fh, records: Iterable[Record]) -> int:
+    count = 0
+    for name, info in records:
+        row = {"name": name}
+        row.update((field, info.get(field, "")) for field in FIELDS)
+        fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def _vcard_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(",", "\\,").replace(";", "\\;").replace("\n", "\\n")
+
+
+def write_vcard(fh, records: Iterable[Record]) -> int:
+    count = 0
+    for name, info in records:
+        fh.write(
+            "BEGIN:VCARD\r\nVERSION:3.0\r\n"
+            f"FN:{_vcard_escape(name)}\r\n"
+            f"N:{_vcard_escape(name)};;;;\r\n"
+            f"TEL:{_vcard_escape(info.get('phone', ''))}\r\n"
+            f"EMAIL:{_vcard_escape(info.get('email', ''))}\r\n"
+            # The whole address goes into the street component
+            f"ADR:;;{_vcard_escape(info.get('address', ''))};;;;\r\n"
+            "END:VCARD\r\n"
+        )
+        count += 1
+    return count
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "vcard": write_vcard}
+
+
+def import_records(storage, records: Iterable[Record], on_duplicate: str = "skip") -> ImportStats:
+    """Add `records` to `storage` in a single batch.
+
+    `on_duplicate` decides what happens to a name that already exists:
+    "skip" keeps the stored contact, "overwrite" replaces it entirely and
+    "merge" only updates the fields that are non-empty in the record.
+    If anything fails, the whole import is rolled back.
+    """
+    if on_duplicate not in DUPLICATE_POLICIES:
+        raise ValueError(f"Unknown duplicate policy: {on_duplicate}")
+    added = updated = skipped = 0
+    start = time.perf_counter()
+    with storage.batch():
+        for name, info in records:
+            if storage.get(name) is None:
+                storage.add(name, info["phone"], info["email"], info["address"])
+                added += 1
+            elif on_duplicate == "skip":
+                skipped += 1
+            elif on_duplicate == "overwrite":
+                storage.delete(name)
+                storage.add(name, info["phone"], info["email"], info["address"])
+                updated += 1
+            else:
+                storage.edit(name, info["phone"], info["email"], info["address"])
+                updated += 1
+    return ImportStats(added, updated, skipped, time.perf_counter() - start)
+
+
+def import_file(storage, path: str, fmt: str | None = None, on_duplicate: str = "skip") -> ImportStats:
+    """Stream the contacts of `path` ("-" for stdin) into `storage`."""
+    fmt = fmt or detect_format(path)
+    with _open(path, "r") as fh:
+        return import_records(storage, READERS[fmt](fh), on_duplicate)
+
+
+def export_file(storage, path: str, fmt: str | None = None) -> Tuple[int, float]:
+    """Write every contact of `storage` to `path` ("-" for stdout).
+
+    Returns the number of contacts written and the elapsed seconds.
+    """
+    fmt = fmt or detect_format(path)
+    start = time.perf_counter()
+    with _open(path, "w") as fh:
+        count = WRITERS[fmt](fh, storage.iter_sorted())
+    return count, time.perf_counter() - start
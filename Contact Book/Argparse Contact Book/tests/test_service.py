@@ -0,0 +1,45 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from contact_cli import open_storage  # noqa: E402
+from service import ContactServer  # noqa: E402
+
+
+def _add(name):
+    return {"op": "add", "name": name, "phone": "555-0100", "email": "", "address": ""}
+
+
+async def _write_during_apply(server):
+    # A pending write makes the apply flush first, which waits on the worker thread
+    await server._dispatch(_add("Ada"))
+    applied, _ = await asyncio.gather(
+        server._dispatch({"op": "apply", "ops": [_add("Bob"), _add("Cy")]}),
+        server._dispatch(_add("Dee")),
+    )
+    await server.flush()
+    return applied
+
+
+@pytest.mark.parametrize("backend", ["json", "journal", "sqlite"])
+def test_write_cannot_slip_between_flush_and_apply(tmp_path, backend):
+    path = str(tmp_path / f"book.{backend}")
+    server = ContactServer(open_storage(backend, path, use_service=False), path + ".sock", flush_interval=60)
+    result = {}
+
+    def run():
+        result["applied"] = asyncio.run(_write_during_apply(server))
+
+    # A nested batch deadlocks on the book's file lock, so run the loop where it can be abandoned
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "the apply deadlocked"
+    assert result["applied"] == 2
+    book = open_storage(backend, path, use_service=False)
+    assert all(book.get(name) is not None for name in ("Ada", "Bob", "Cy", "Dee"))
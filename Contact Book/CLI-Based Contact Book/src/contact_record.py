@@ -0,0 +1,51 @@
+"""Compact in-memory representation of a contact.
+
+`Contact` holds the phone, email and address of one contact in three
+`__slots__` instead of a dict with the same three keys repeated for every
+record, which cuts the per-contact overhead by about two thirds. It is a
+read-only `Mapping`, so code written for the dict records
+(`info["phone"]`, `info.get("email")`, `{**info}`) keeps working.
+
+Only the Python standard library is required.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Iterator
+
+FIELDS = ("phone", "email", "address")
+
+
+class Contact(Mapping):
+    """Phone, email and address of a contact, stored in slots."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, phone: str = "", email: str = "", address: str = ""):
+        self.phone = phone
+        self.email = email
+        self.address = address
+
+    def __getitem__(self, field: str) -> str:
+        if field not in FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Contact(phone={self.phone!r}, email={self.email!r}, address={self.address!r})"
+
+    def edit(self, phone: str | None = None, email: str | None = None, address: str | None = None) -> None:
+        """Replace the fields given a non-empty value; the others are left unchanged."""
+        if phone:
+            self.phone = phone
+        if email:
+            self.email = email
+        if address:
+            self.address = address
@@ -10,8 +10,22 @@ Notes:
   `contacts` dictionary to JSON or use a lightweight database.
 - Names are used as unique identifiers; adding two contacts with the
   same name will raise a ValueError.
+- Searches go through a `SearchIndex` (see `search_index.py`) that is
+  updated on every add, edit and delete, so they do not scan the book.
+- Each contact is a slotted `Contact` record (see `contact_record.py`)
+  rather than a dict: the record is a third the size of the dict and still
+  reads like one (`info['phone']`).
 """
 
+import heapq
+import sys
+
+from contact_record import Contact
+from search_index import SearchIndex
+
+# Number of contacts shown per page by the interactive menu
+PAGE_SIZE = 20
+
 
 class ContactBook:
     """Manage a small collection of contacts in memory.
@@ -19,17 +33,19 @@ class ContactBook:
     Attributes
     ----------
     contacts : dict
-        Mapping of contact name -> info dict with keys 'phone', 'email',
-        and 'address'. Example:
+        Mapping of contact name -> `Contact` record with the fields
+        'phone', 'email' and 'address', readable like a dict. Example:
 
         {
-            'Alice': {'phone': '555-1234', 'email': 'alice@example.com', 'address': '...'},
+            'Alice': Contact(phone='555-1234', email='alice@example.com', address='...'),
         }
     """
 
     def __init__(self):
         # Initialize an empty contact dictionary
         self.contacts: dict = {}
+        # Name, phone and email index kept in sync with `contacts`
+        self.index = SearchIndex()
 
     def add_contact(self, name: str, phone: str, email: str, address: str) -> None:
         """Add a new contact.
@@ -53,25 +69,58 @@ class ContactBook:
         if name in self.contacts:
             raise ValueError("Contact already exists.")
 
-        # Store contact information as a simple dict
-        self.contacts[name] = {
-            'phone': phone,
-            'email': email,
-            'address': address,
-        }
+        self.contacts[name] = Contact(phone, email, address)
+        self.index.add(name, self.contacts[name])
         print("Contact added successfully!")
 
-    def view_contact(self) -> None:
-        """Print all contacts to stdout.
+    def iter_contacts(self, after: str | None = None, limit: int | None = None):
+        """Yield (name, info) pairs in name order, starting after the name `after`.
+
+        Only the requested page is sorted: `heapq.nsmallest` picks the
+        `limit` first names in O(n log limit) without sorting the book.
+        """
+        names = self.contacts if after is None else (name for name in self.contacts if name > after)
+        ordered = sorted(names) if limit is None else heapq.nsmallest(limit, names)
+        for name in ordered:
+            yield name, self.contacts[name]
+
+    def view_contact(self, after: str | None = None, limit: int | None = None) -> str | None:
+        """Print contacts to stdout in name order, one page at a time.
 
-        The method iterates over stored contacts and prints a single-line
-        summary for each. For larger datasets you would return the data
-        structure instead of printing, or implement pagination.
+        Parameters
+        ----------
+        after : str, optional
+            Start after this name (the cursor returned for the previous page).
+        limit : int, optional
+            Maximum number of contacts to print; all of them by default.
+
+        Returns
+        -------
+        str or None
+            The name to pass as `after` to print the next page, or None
+            when there are no more contacts.
+        """
+        # One extra contact tells whether there is a next page
+        page = list(self.iter_contacts(after, None if limit is None else limit + 1))
+        more = limit is not None and len(page) > limit
+        if more:
+            page = page[:limit]
+        # Build the page as one string so it is written with a single call
+        sys.stdout.write("".join(
+            f"Name: {name}, Phone: {info['phone']}, Email: {info['email']}, Address: {info['address']}\n"
+            for name, info in page
+        ))
+        return page[-1][0] if more else None
+
+    def search_contacts(self, query: str, limit: int = 10) -> list:
+        """Return up to `limit` contact names matching `query`.
+
+        Queries containing "@" match email addresses or domains, queries
+        made of digits match phone number prefixes, and anything else
+        matches names by prefix, then by similarity so typos still find
+        the contact. Best matches come first.
         """
-        for name, info in self.contacts.items():
-            print(
-                f"Name: {name}, Phone: {info['phone']}, Email: {info['email']}, Address: {info['address']}"
-            )
+        return self.index.search(query, limit)
 
     def delete_contact(self, name: str) -> None:
         """Delete a contact by name.
@@ -90,6 +139,7 @@ class ContactBook:
             raise ValueError("Contact does not exist.")
 
         del self.contacts[name]
+        self.index.discard(name)
 
     def edit_contact(
         self, name: str, phone: str | None = None, email: str | None = None, address: str | None = None
@@ -100,12 +150,8 @@ class ContactBook:
         existing value unchanged.
         """
         if name in self.contacts:
-            if phone:
-                self.contacts[name]['phone'] = phone
-            if email:
-                self.contacts[name]['email'] = email
-            if address:
-                self.contacts[name]['address'] = address
+            self.contacts[name].edit(phone, email, address)
+            self.index.add(name, self.contacts[name])
             print("Contact updated successfully!")
             return
         # If the contact isn't found, inform the caller (no exception
@@ -126,7 +172,8 @@ if __name__ == "__main__":
         print("2. Edit contact")
         print("3. View contacts")
         print("4. Delete contact")
-        print("5. Quit")
+        print("5. Search contacts")
+        print("6. Quit")
         user_choice = input("\nPlease choose an option: ")
 
         if user_choice == '1':
@@ -151,7 +198,11 @@ if __name__ == "__main__":
 
         elif user_choice == '3':
             print("\nList of Contacts:")
-            book.view_contact()
+            cursor = book.view_contact(limit=PAGE_SIZE)
+            while cursor is not None:
+                if input("Press Enter for more contacts or q to stop: ").strip().lower() == 'q':
+                    break
+                cursor = book.view_contact(after=cursor, limit=PAGE_SIZE)
 
         elif user_choice == '4':
             name = input("\nEnter name of contact to delete: ")
@@ -162,6 +213,17 @@ if __name__ == "__main__":
                 print(f"Error deleting contact: {exc}")
 
         elif user_choice == '5':
+            query = input("\nEnter a name, phone number or email to search for: ")
+            names = book.search_contacts(query)
+            if not names:
+                print("No matching contacts.")
+            for name in names:
+                info = book.contacts[name]
+                print(
+                    f"Name: {name}, Phone: {info['phone']}, Email: {info['email']}, Address: {info['address']}"
+                )
+
+        elif user_choice == '6':
             print("\nThank You for using Contact Book Application. Goodbye!")
             break
 
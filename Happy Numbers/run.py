@@ -1,3 +1,6 @@
+from functools import lru_cache
+
+
 def is_happy(n: int) -> bool:
     """
     Checks whether a given number is happy or not.
@@ -29,10 +32,333 @@ def is_happy(n: int) -> bool:
     return n == 1
 
 
+# Numbers are split into groups of three digits; the sum of the squared
+# digits of every group value is precomputed arithmetically.
+DIGIT_GROUP = 1000
+GROUP_SQUARE_SUMS = [
+    (g // 100) ** 2 + (g // 10 % 10) ** 2 + (g % 10) ** 2 for g in range(DIGIT_GROUP)
+]
+
+# A 64-bit integer has at most 20 digits, so one step maps it to at most
+# 20 * 9**2 = 1620. The happiness of everything below that bound is
+# precomputed once; any 64-bit number is then classified by a single step
+# and a table lookup.
+SMALL_LIMIT = 20 * 9 ** 2 + 1
+HAPPY_TABLE = bytes(is_happy(i) for i in range(SMALL_LIMIT))
+
+# Memoized classification of whole blocks of DIGIT_GROUP numbers, keyed by
+# the digit-square sum of the digits above the lowest group.
+_block_patterns: dict = {}
+
+
+def digit_square_sum(n: int) -> int:
+    """
+    Returns the sum of the squares of the decimal digits of ``n``.
+
+    Digits are consumed three at a time with ``divmod`` and a lookup table,
+    without converting the number to a string.
+
+    :param n: A non-negative integer.
+    :type n: int
+    :returns: The sum of the squared digits.
+    :rtype: int
+
+    :Example:
+
+    >>> digit_square_sum(19)
+    82
+    """
+    total = 0
+    while n:
+        n, group = divmod(n, DIGIT_GROUP)
+        total += GROUP_SQUARE_SUMS[group]
+    return total
+
+
+def _is_small_happy(total: int) -> bool:
+    """Looks up the happiness of a digit-square sum, reducing it first if needed."""
+    while total >= SMALL_LIMIT:
+        total = digit_square_sum(total)
+    return bool(HAPPY_TABLE[total])
+
+
+def _block_pattern(prefix_sum: int) -> bytes:
+    """
+    Returns the happy flags of a block of DIGIT_GROUP consecutive numbers.
+
+    Every number ``h * DIGIT_GROUP + low`` of a block has the digit-square
+    sum ``prefix_sum + GROUP_SQUARE_SUMS[low]``, where ``prefix_sum`` is the
+    digit-square sum of ``h``, so blocks sharing a prefix sum share a pattern.
+    """
+    pattern = _block_patterns.get(prefix_sum)
+    if pattern is None:
+        pattern = bytes(_is_small_happy(prefix_sum + s) for s in GROUP_SQUARE_SUMS)
+        _block_patterns[prefix_sum] = pattern
+    return pattern
+
+
+def classify_range(lo: int, hi: int) -> bytearray:
+    """
+    Classifies every integer of the range ``[lo, hi)`` as happy or not.
+
+    The range is scanned in blocks of a thousand numbers. A block is
+    described by the digit-square sum of its leading digits alone, and its
+    flags are copied from a memoized pattern, so the cost per number is a
+    fraction of a byte copy rather than a full happiness check.
+
+    :param lo: The first number of the range (non-negative).
+    :type lo: int
+    :param hi: The end of the range (exclusive).
+    :type hi: int
+    :returns: One byte per number of the range, 1 if it is happy and 0 otherwise.
+    :rtype: bytearray
+
+    :Example:
+
+    >>> list(classify_range(5, 11))
+    [0, 0, 1, 0, 0, 1]
+    """
+    if lo < 0:
+        raise ValueError("The range must not contain negative numbers")
+    flags = bytearray()
+    block, offset = divmod(lo, DIGIT_GROUP)
+    while lo < hi:
+        pattern = _block_pattern(digit_square_sum(block))
+        end = min(DIGIT_GROUP, offset + hi - lo)
+        flags += pattern[offset:end]
+        lo += end - offset
+        block += 1
+        offset = 0
+    return flags
+
+
+# (base, power) -> (group size, digit-power sum of every group value)
+_digit_power_tables: dict = {}
+
+# (base, power) -> {member of an attractor cycle: whether the cycle is {1}}
+_attractors: dict = {}
+
+
+def _digit_power_table(base: int, power: int) -> tuple:
+    """
+    Returns the group size and lookup table used by :func:`digit_power_sum`.
+
+    Digits are consumed in groups of as many digits as fit below 1024, so
+    the table stays small for every base.
+    """
+    key = (base, power)
+    table = _digit_power_tables.get(key)
+    if table is None:
+        group = base
+        while group * base <= 1024:
+            group *= base
+        sums = [0] * group
+        for value in range(1, group):
+            sums[value] = sums[value // base] + (value % base) ** power
+        table = (group, sums)
+        _digit_power_tables[key] = table
+    return table
+
+
+def digit_power_sum(n: int, base: int = 10, power: int = 2) -> int:
+    """
+    Returns the sum of the ``power``-th powers of the base-``base`` digits of ``n``.
+
+    :param n: A non-negative integer.
+    :type n: int
+    :param base: The base the digits are taken in.
+    :type base: int
+    :param power: The power each digit is raised to.
+    :type power: int
+    :returns: The digit-power sum.
+    :rtype: int
+
+    :Example:
+
+    >>> digit_power_sum(153, power=3)
+    153
+    """
+    group, sums = _digit_power_table(base, power)
+    total = 0
+    while n:
+        n, digits = divmod(n, group)
+        total += sums[digits]
+    return total
+
+
+def is_happy_general(n: int, base: int = 10, power: int = 2) -> bool:
+    """
+    Checks whether ``n`` is a happy number in a given base and power.
+
+    Repeatedly replaces ``n`` by the sum of the ``power``-th powers of its
+    base-``base`` digits; ``n`` is happy when this reaches 1. Instead of
+    remembering every visited value, loops are found with Brent's cycle
+    detection in constant memory. The members of every cycle found are
+    cached per ``(base, power)``, so later calls stop as soon as they reach
+    a known attractor instead of rediscovering it. Works for integers with
+    thousands of digits, since no string conversion is involved.
+
+    :param n: The number to check (positive).
+    :type n: int
+    :param base: The base the digits are taken in (at least 2).
+    :type base: int
+    :param power: The power each digit is raised to (at least 1).
+    :type power: int
+    :returns: True if the number is happy, False otherwise.
+    :rtype: bool
+
+    :Example:
+
+    >>> is_happy_general(19)
+    True
+
+    >>> is_happy_general(7, base=2)
+    True
+
+    >>> is_happy_general(2, power=3)
+    False
+    """
+    if base < 2 or power < 1:
+        raise ValueError("The base must be at least 2 and the power at least 1")
+    if n < 1:
+        raise ValueError("Happiness is only defined for positive integers")
+    known = _attractors.setdefault((base, power), {})
+    if n in known:
+        return known[n]
+
+    # Brent's algorithm: the tortoise waits at powers of two while the hare
+    # walks; they meet once the hare has gone around the cycle.
+    limit = cycle_length = 1
+    tortoise = n
+    hare = digit_power_sum(n, base, power)
+    while hare != tortoise:
+        if hare in known:
+            return known[hare]
+        if limit == cycle_length:
+            tortoise = hare
+            limit *= 2
+            cycle_length = 0
+        hare = digit_power_sum(hare, base, power)
+        cycle_length += 1
+
+    # The hare is on a cycle of cycle_length values: record all of them
+    members = []
+    for _ in range(cycle_length):
+        members.append(hare)
+        hare = digit_power_sum(hare, base, power)
+    happy = 1 in members
+    for member in members:
+        known[member] = happy
+    return happy
+
+
+@lru_cache(maxsize=None)
+def _square_sum_counts(digits: int) -> tuple:
+    """
+    Counts the digit strings of a given length by digit-square sum.
+
+    Entry ``s`` of the result is the number of ``digits``-long strings of
+    decimal digits (leading zeros allowed) whose squared digits sum to ``s``.
+    """
+    if digits == 0:
+        return (1,)
+    shorter = _square_sum_counts(digits - 1)
+    counts = [0] * (len(shorter) + 81)
+    for s, ways in enumerate(shorter):
+        if ways:
+            for digit in range(10):
+                counts[s + digit * digit] += ways
+    return tuple(counts)
+
+
+@lru_cache(maxsize=None)
+def _happy_completions(digits: int, prefix_sum: int) -> int:
+    """
+    Counts the ways to complete a prefix into a happy number.
+
+    Returns how many ``digits``-long digit strings, appended to a prefix
+    whose digit-square sum is ``prefix_sum``, give a happy number.
+    """
+    return sum(
+        ways
+        for s, ways in enumerate(_square_sum_counts(digits))
+        if ways and _is_small_happy(prefix_sum + s)
+    )
+
+
+def count_happy_below(limit: int) -> int:
+    """
+    Counts the happy numbers in ``[1, limit)`` without enumerating them.
+
+    A number is happy exactly when its digit-square sum is, so only the
+    distribution of digit-square sums matters. Walking the digits of
+    ``limit`` from the most significant one, every smaller digit at a
+    position fixes a prefix and leaves the remaining positions free; the
+    numbers of free completions per digit-square sum (at most 81 per
+    digit) are counted with dynamic programming and combined with the
+    small-number happiness table. Ranges like ``[1, 10**18)`` take
+    milliseconds.
+
+    :param limit: The end of the range (exclusive).
+    :type limit: int
+    :returns: The number of happy numbers below ``limit``.
+    :rtype: int
+
+    :Example:
+
+    >>> count_happy_below(50)
+    11
+    """
+    digits = []
+    while limit > 0:
+        limit, digit = divmod(limit, 10)
+        digits.append(digit)
+    digits.reverse()
+
+    count = 0
+    prefix_sum = 0
+    for position, digit in enumerate(digits):
+        remaining = len(digits) - position - 1
+        for smaller in range(digit):
+            count += _happy_completions(remaining, prefix_sum + smaller * smaller)
+        prefix_sum += digit * digit
+    return count
+
+
+def count_happy(lo: int, hi: int) -> int:
+    """
+    Counts the happy numbers in ``[lo, hi)``.
+
+    :param lo: The first number of the range.
+    :type lo: int
+    :param hi: The end of the range (exclusive).
+    :type hi: int
+    :returns: The number of happy numbers in the range.
+    :rtype: int
+
+    :Example:
+
+    >>> count_happy(10, 20)
+    3
+    """
+    return count_happy_below(max(hi, 0)) - count_happy_below(max(lo, 0))
+
+
 if __name__ == "__main__":
     assert is_happy(44), 'Test Case 1 >> FAILED'
     assert not is_happy(2), 'Test Case 2 >> FAILED'
     assert is_happy(44), "Test Case 3 >> FAILED"
     assert is_happy(86), "Test Case 4 >> FAILED"
     assert is_happy(139), "Test Case 5 >> FAILED"
+    assert list(classify_range(0, 50)) == [is_happy(i) for i in range(50)], "Test Case 6 >> FAILED"
+    assert list(classify_range(998_990, 1_001_010)) == [
+        is_happy(i) for i in range(998_990, 1_001_010)
+    ], "Test Case 7 >> FAILED"
+    assert classify_range(2**64 - 5, 2**64 + 5)[4] == is_happy(2**64 - 1), "Test Case 8 >> FAILED"
+    assert all(is_happy_general(i) == is_happy(i) for i in range(1, 2_000)), "Test Case 9 >> FAILED"
+    assert is_happy_general(10 ** 5_000), "Test Case 10 >> FAILED"
+    assert all(is_happy_general(i, base=2) for i in range(1, 100)), "Test Case 11 >> FAILED"
+    for lo, hi in [(0, 1), (0, 1_000), (1, 12_345), (999, 100_001), (4_321, 987_654)]:
+        assert count_happy(lo, hi) == sum(classify_range(lo, hi)), "Test Case 12 >> FAILED"
+    assert count_happy_below(10 ** 8) == 14_255_666, "Test Case 13 >> FAILED"
     print("All tests passed!")
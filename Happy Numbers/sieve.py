@@ -0,0 +1,177 @@
+"""
+Vectorized happy-number sieve built on NumPy.
+
+This module complements ``run.py`` for very large ranges: digit-square
+sums are computed for whole ``int64`` arrays at once, ranges are split
+across a process pool whose workers write into a shared-memory bitset,
+and the bitset is streamed to a compact file (one bit per number).
+
+Requires NumPy::
+
+    pip install numpy
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from run import DIGIT_GROUP, GROUP_SQUARE_SUMS, _is_small_happy
+
+# Squared-digit sum of every three-digit group, as a lookup array.
+GROUP_SQUARES = np.array(GROUP_SQUARE_SUMS, dtype=np.int64)
+
+# An int64 has at most 19 digits, so a block prefix (the number without its
+# lowest three digits) has at most 16 digits and a digit-square sum of at most
+# 16 * 81; adding the lowest group gives at most 16 * 81 + 243.
+_MAX_PREFIX_SUM = 16 * 81
+HAPPY_SMALL = np.array(
+    [_is_small_happy(i) for i in range(_MAX_PREFIX_SUM + GROUP_SQUARES.max() + 1)], dtype=bool
+)
+
+# BLOCK_PATTERNS[p, low] tells whether a number whose leading digits have the
+# digit-square sum p and whose lowest three digits are low is happy.
+BLOCK_PATTERNS = HAPPY_SMALL[np.arange(_MAX_PREFIX_SUM + 1)[:, None] + GROUP_SQUARES[None, :]]
+
+# Numbers classified by one worker task (a multiple of 8).
+CHUNK_SIZE = 16_000_000
+# Numbers held in the shared-memory bitset at once (128 MB of bits).
+WINDOW_SIZE = 1_024_000_000
+
+
+def digit_square_sums(values):
+    """
+    Returns the sum of the squared decimal digits of every value.
+
+    :param values: Non-negative integers.
+    :type values: numpy.ndarray
+    :returns: The digit-square sums, as an int64 array.
+    :rtype: numpy.ndarray
+    """
+    values = np.asarray(values, dtype=np.int64)
+    totals = np.zeros(values.shape, dtype=np.int64)
+    while values.any():
+        values, groups = np.divmod(values, DIGIT_GROUP)
+        totals += GROUP_SQUARES[groups]
+    return totals
+
+
+def happy_mask(lo, hi):
+    """
+    Classifies every integer of ``[lo, hi)`` as happy or not.
+
+    Digit-square sums are only computed for the block prefixes (the numbers
+    without their lowest three digits); each block of a thousand numbers is
+    then a row of ``BLOCK_PATTERNS``.
+
+    :param lo: The first number of the range (non-negative).
+    :type lo: int
+    :param hi: The end of the range (exclusive, at most 2**63).
+    :type hi: int
+    :returns: One boolean per number of the range.
+    :rtype: numpy.ndarray
+    """
+    if lo >= hi:
+        return np.zeros(0, dtype=bool)
+    first_block = lo // DIGIT_GROUP
+    last_block = (hi - 1) // DIGIT_GROUP
+    prefixes = np.arange(first_block, last_block + 1, dtype=np.int64)
+    rows = BLOCK_PATTERNS[digit_square_sums(prefixes)]
+    start = lo - first_block * DIGIT_GROUP
+    return rows.ravel()[start:start + hi - lo]
+
+
+def _sieve_chunk(shm_name, window_lo, lo, hi):
+    """
+    Worker task: classifies ``[lo, hi)`` into the shared bitset.
+
+    The bit of number ``n`` is bit ``(n - window_lo) % 8`` of byte
+    ``(n - window_lo) // 8``. ``lo - window_lo`` is a multiple of 8, so
+    tasks never share a byte.
+
+    :returns: The number of happy numbers in the chunk.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        mask = happy_mask(lo, hi)
+        bits = np.packbits(mask, bitorder="little")
+        offset = (lo - window_lo) // 8
+        shm.buf[offset:offset + len(bits)] = bits.tobytes()
+        return int(np.count_nonzero(mask))
+    finally:
+        shm.close()
+
+
+def sieve(hi, lo=0, path=None, workers=None, chunk_size=CHUNK_SIZE, window_size=WINDOW_SIZE):
+    """
+    Counts the happy numbers of ``[lo, hi)`` on several cores.
+
+    The range is processed one window at a time. Each window is split into
+    chunks that the worker processes classify into a shared-memory bitset;
+    the finished window is appended to ``path`` when given, so memory stays
+    bounded by the window size however large the range is.
+
+    :param hi: The end of the range (exclusive).
+    :type hi: int
+    :param lo: The first number of the range.
+    :type lo: int
+    :param path: Optional file receiving the bitset (bit ``i`` of the file,
+        least significant bit first, stands for ``lo + i``).
+    :type path: str
+    :param workers: Number of worker processes (defaults to the CPU count).
+    :type workers: int
+    :param chunk_size: Numbers per worker task; rounded to a multiple of 8.
+    :type chunk_size: int
+    :param window_size: Numbers per shared-memory window; rounded to a multiple of 8.
+    :type window_size: int
+    :returns: The number of happy numbers in the range.
+    :rtype: int
+    """
+    chunk_size = max(8, chunk_size - chunk_size % 8)
+    window_size = max(chunk_size, window_size - window_size % 8)
+    window_bytes = (min(window_size, max(hi - lo, 0)) + 7) // 8
+    count = 0
+    out = open(path, "wb") if path is not None else None
+    shm = shared_memory.SharedMemory(create=True, size=max(window_bytes, 1))
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            for window_lo in range(lo, hi, window_size):
+                window_hi = min(window_lo + window_size, hi)
+                starts = range(window_lo, window_hi, chunk_size)
+                futures = [
+                    pool.submit(_sieve_chunk, shm.name, window_lo, start, min(start + chunk_size, window_hi))
+                    for start in starts
+                ]
+                count += sum(future.result() for future in futures)
+                if out is not None:
+                    out.write(shm.buf[:(window_hi - window_lo + 7) // 8])
+    finally:
+        shm.close()
+        shm.unlink()
+        if out is not None:
+            out.close()
+    return count
+
+
+def read_bitset(path, lo=0):
+    """
+    Loads a bitset written by :func:`sieve` and returns its happy numbers.
+
+    :param path: The bitset file.
+    :type path: str
+    :param lo: The first number of the range the file was written for.
+    :type lo: int
+    :returns: The happy numbers recorded in the file.
+    :rtype: numpy.ndarray
+    """
+    bits = np.unpackbits(np.fromfile(path, dtype=np.uint8), bitorder="little")
+    return np.flatnonzero(bits) + lo
+
+
+if __name__ == "__main__":
+    from run import classify_range
+
+    assert np.array_equal(happy_mask(0, 10_000), np.frombuffer(classify_range(0, 10_000), dtype=bool))
+    assert np.array_equal(happy_mask(123_457, 131_071), np.frombuffer(classify_range(123_457, 131_071), dtype=bool))
+    assert sieve(10**8) == 14_255_666
+    print("All tests passed!")
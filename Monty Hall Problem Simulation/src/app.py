@@ -1,6 +1,43 @@
 import streamlit as st
+import os
 import time
-from monty_hall import simulate_game
+import numpy as np
+import pandas as pd
+from convergence import ConvergenceTracker
+from monty_hall import ENGINE_VERSION, play_games
+from result_cache import ResultCache
+
+# Minimum number of seconds between two UI updates (10 frames per second)
+FRAME_INTERVAL = 0.1
+# Number of points drawn on each chart over a whole run
+CHART_POINTS = 1000
+# Number of points kept by the convergence history shown when a run ends
+HISTORY_POINTS = 10_000
+# On-disk store of the results of seeded runs, shared across app restarts
+CACHE_FILE = os.path.join(os.path.dirname(__file__), "results_cache.sqlite")
+# Seeded results older than a week are recomputed
+CACHE_MAX_AGE = 7 * 24 * 3600
+
+
+@st.cache_resource
+def get_result_cache():
+    """Returns the result cache shared by every session of the app."""
+    return ResultCache(max_age=CACHE_MAX_AGE, path=CACHE_FILE)
+
+
+def show_metrics(stay_placeholder, switch_placeholder, stay_pct, switch_pct):
+    """Displays the winning percentages of both strategies."""
+    stay_placeholder.metric(
+        label="Win Percentage (Stay)",
+        value=f"{stay_pct:.2%}",
+    )
+    switch_placeholder.metric(
+        label="Win Percentage (Switch)",
+        value=f"{switch_pct:.2%}",
+        delta=f"{(switch_pct - stay_pct):.2%}",
+        delta_color="normal"
+    )
+
 
 # Set page configuration
 st.set_page_config(
@@ -15,12 +52,19 @@ with st.sidebar:
     num_games = st.number_input(
         label="Number of simulations to run:",
         min_value=100,
-        max_value=10000,
+        max_value=10_000_000,
         value=1000,
         step=100,
         help="Select the number of times you want to run the simulation."
     )
+    use_seed = st.checkbox(
+        "Reproducible run",
+        value=True,
+        help="Seeded runs are cached, so repeating one returns its results immediately."
+    )
+    seed = st.number_input("Random seed:", min_value=0, value=42, step=1, disabled=not use_seed)
     start_button = st.button("Start Simulation", type="primary")
+    cache_stats_placeholder = st.empty()
 
 # Main page layout
 st.title("🚗 Monty Hall Problem Simulator")
@@ -49,47 +93,87 @@ if start_button:
         st.subheader("Win % (Switching)")
         switch_chart_placeholder = st.empty()
 
-    # Initialize variables for simulation
-    wins_no_switch = 0
-    wins_switch = 0
-    stay_history = []
-    switch_history = []
-
-    for i in range(num_games):
-        # Correctly call the imported function
-        num_wins_without_switching, num_wins_with_switching = simulate_game(1)
-
-        wins_no_switch += num_wins_without_switching
-        wins_switch += num_wins_with_switching
-
-        # Calculate current win percentages
-        current_stay_pct = (wins_no_switch / (i + 1))
-        current_switch_pct = (wins_switch / (i + 1))
-        
-        stay_history.append(current_stay_pct)
-        switch_history.append(current_switch_pct)
-
-        # Update progress bar
-        progress_bar.progress((i + 1) / num_games, text=f"Simulation in progress... ({i+1}/{num_games})")
-        
-        # Update metrics
-        stay_metric_placeholder.metric(
-            label="Win Percentage (Stay)",
-            value=f"{current_stay_pct:.2%}",
+    # Seeded runs are looked up in the result cache first
+    cache = get_result_cache()
+    seed = int(seed) if use_seed else None
+    cache_key = ResultCache.make_key(
+        "monty_hall.play_games", ENGINE_VERSION, {"num_games": num_games, "chart_points": CHART_POINTS}, seed
+    )
+    result = cache.get(cache_key) if seed is not None else None
+
+    if result is not None:
+        show_metrics(stay_metric_placeholder, switch_metric_placeholder, result["stay_pct"], result["switch_pct"])
+    else:
+        # Start both charts empty; new points are appended with add_rows
+        stay_chart = stay_chart_placeholder.line_chart(
+            pd.DataFrame({"Stay": []}, dtype=float), use_container_width=True
         )
-        switch_metric_placeholder.metric(
-            label="Win Percentage (Switch)",
-            value=f"{current_switch_pct:.2%}",
-            delta=f"{(current_switch_pct - current_stay_pct):.2%}",
-            delta_color="normal"
+        switch_chart = switch_chart_placeholder.line_chart(
+            pd.DataFrame({"Switch": []}, dtype=float), use_container_width=True
         )
 
-        # Update charts with full history for a smoother look
-        stay_chart_placeholder.line_chart(stay_history, use_container_width=True)
-        switch_chart_placeholder.line_chart(switch_history, use_container_width=True)
-        
-        time.sleep(0.001) # Keep the delay for visual effect
+        # Initialize variables for simulation
+        rng = np.random.default_rng(seed)
+        # Every batch of games adds one point to the charts
+        batch_size = max(1, num_games // CHART_POINTS)
+        games_played = 0
+        wins_no_switch = 0
+        wins_switch = 0
+        # Bounded-memory history of both win rates, log-spaced to keep the early games
+        history = ConvergenceTracker(series=2, capacity=HISTORY_POINTS, log_spaced=True)
+        new_games, new_stay, new_switch = [], [], []
+        last_frame = 0.0
+
+        while games_played < num_games:
+            # Play the next batch of games in one vectorized call
+            n = min(batch_size, num_games - games_played)
+            stay_wins, switch_wins = play_games(n, rng, common_random_numbers=False)
+            history.update(stay_wins, switch_wins)
+
+            games_played += n
+            wins_no_switch += int(np.count_nonzero(stay_wins))
+            wins_switch += int(np.count_nonzero(switch_wins))
+
+            # Calculate current win percentages
+            current_stay_pct = wins_no_switch / games_played
+            current_switch_pct = wins_switch / games_played
+
+            new_games.append(games_played)
+            new_stay.append(current_stay_pct)
+            new_switch.append(current_switch_pct)
+
+            # Throttle UI updates to a fixed frame rate
+            now = time.perf_counter()
+            if now - last_frame < FRAME_INTERVAL and games_played < num_games:
+                continue
+            last_frame = now
+
+            # Update progress bar
+            progress_bar.progress(games_played / num_games, text=f"Simulation in progress... ({games_played}/{num_games})")
+
+            # Update metrics
+            show_metrics(stay_metric_placeholder, switch_metric_placeholder, current_stay_pct, current_switch_pct)
+
+            # Push only the points added since the last frame to the charts
+            stay_chart.add_rows(pd.DataFrame({"Stay": new_stay}, index=new_games))
+            switch_chart.add_rows(pd.DataFrame({"Switch": new_switch}, index=new_games))
+            new_games, new_stay, new_switch = [], [], []
+
+        result = {
+            "stay_pct": current_stay_pct,
+            "switch_pct": current_switch_pct,
+            "history": history.curve(),
+        }
+        if seed is not None:
+            cache.put(cache_key, result)
+
+    # Redraw both charts once from the full convergence history
+    games, stay_rates, switch_rates = result["history"]
+    stay_chart_placeholder.line_chart(pd.DataFrame({"Stay": stay_rates}, index=games), use_container_width=True)
+    switch_chart_placeholder.line_chart(pd.DataFrame({"Switch": switch_rates}, index=games), use_container_width=True)
 
     progress_bar.progress(1.0, text="Simulation Complete!")
+    stats = cache.stats
+    cache_stats_placeholder.caption(f"Result cache: {stats['hits']} hits, {stats['misses']} misses")
 else:
     st.info("Click the 'Start Simulation' button in the sidebar to begin.")
\ No newline at end of file
@@ -0,0 +1,137 @@
+from array import array
+
+import numpy as np
+
+
+class ConvergenceTracker:
+    """
+    Keeps a bounded-memory history of running win rates.
+
+    Instead of storing one value per game, the tracker records the running
+    win rate of each series at checkpoints. When the checkpoint buffer is
+    full, every other checkpoint is dropped and the spacing is doubled
+    (uniform checkpoints), or the ratio between checkpoints is squared and
+    the checkpoints are resampled onto that coarser grid (log-spaced
+    checkpoints, whose dense early part is kept), so memory
+    stays at `capacity` points no matter how many games are played while
+    the curve keeps enough detail for plotting.
+
+    Args:
+        series (int): The number of outcome series tracked side by side,
+            e.g. 2 for staying and switching.
+        capacity (int): The maximum number of checkpoints kept.
+        log_spaced (bool): Place checkpoints on a geometric scale, which
+            keeps more detail early in the run, instead of evenly.
+    """
+
+    def __init__(self, series=1, capacity=10_000, log_spaced=False):
+        if capacity < 2 or capacity % 2:
+            raise ValueError("Capacity must be an even number of at least 2")
+        self.series = series
+        self.capacity = capacity
+        self.log_spaced = log_spaced
+        self.trials = 0
+        self.wins = [0] * series
+        # Distance between uniform checkpoints, or ratio between log-spaced ones
+        self._spacing = 1 if not log_spaced else 1.001
+        self._checkpoints = array("q")
+        self._rates = [array("d") for _ in range(series)]
+
+    def _next_checkpoint(self, after):
+        """Returns the first checkpoint after the trial count `after`."""
+        if not self._checkpoints:
+            return 1 if self.log_spaced else self._spacing
+        last = self._checkpoints[-1]
+        if self.log_spaced:
+            point = max(last + 1, int(np.ceil(last * self._spacing)))
+        else:
+            point = last + self._spacing
+        return max(point, after + 1)
+
+    def _compact(self):
+        """Drops checkpoints to free at least half of the buffer and widens the spacing."""
+        if self.log_spaced:
+            # Resample onto the grid of the squared ratio. The first
+            # checkpoints are consecutive trial counts, which the wider grid
+            # still keeps, so only the geometric tail is thinned out
+            keep = []
+            while not keep or len(keep) > self.capacity // 2:
+                self._spacing **= 2
+                keep = self._log_grid()
+        else:
+            # Checkpoints are the multiples of the stride: keep those of the doubled stride
+            keep = range(1, len(self._checkpoints), 2)
+            self._spacing *= 2
+        self._checkpoints = array("q", (self._checkpoints[i] for i in keep))
+        self._rates = [array("d", (rates[i] for i in keep)) for rates in self._rates]
+
+    def _log_grid(self):
+        """Returns the indices of the checkpoints that lie on the current log-spaced grid."""
+        keep = [0]
+        last = self._checkpoints[0]
+        for i in range(1, len(self._checkpoints)):
+            point = self._checkpoints[i]
+            if point >= max(last + 1, int(np.ceil(last * self._spacing))):
+                keep.append(i)
+                last = point
+        return keep
+
+    def update(self, *outcomes):
+        """
+        Records a batch of game outcomes.
+
+        Args:
+            *outcomes (sequence of bool): One sequence of outcomes per series,
+                all of the same length (e.g. the arrays returned by `play_games`).
+        """
+        if len(outcomes) != self.series:
+            raise ValueError(f"Expected {self.series} outcome series, got {len(outcomes)}")
+        cumulative = [np.cumsum(outcome, dtype=np.int64) for outcome in outcomes]
+        n = len(cumulative[0])
+        if n == 0:
+            return
+        start = self.trials
+        end = start + n
+
+        point = self._next_checkpoint(start)
+        while point <= end:
+            # Collect the checkpoints that fit in this batch and in the buffer
+            points = []
+            while point <= end and len(self._checkpoints) < self.capacity:
+                points.append(point)
+                self._checkpoints.append(point)
+                point = self._next_checkpoint(point)
+            offsets = np.array(points) - start - 1
+            positions = np.array(points, dtype=float)
+            for rates, won, wins in zip(self._rates, self.wins, cumulative):
+                rates.extend(((won + wins[offsets]) / positions).tolist())
+            if len(self._checkpoints) >= self.capacity:
+                self._compact()
+                point = self._next_checkpoint(points[-1])
+
+        self.trials = end
+        self.wins = [won + int(wins[-1]) for won, wins in zip(self.wins, cumulative)]
+
+    @property
+    def rates(self):
+        """The current running win rate of every series."""
+        return [won / self.trials if self.trials else 0.0 for won in self.wins]
+
+    def curve(self):
+        """
+        Returns the recorded convergence curve.
+
+        Returns:
+            tuple: The array of checkpoints (number of games played) followed by
+            one array of running win rates per series. The current state is
+            always included as the last point.
+        """
+        checkpoints = np.frombuffer(self._checkpoints, dtype=np.int64).copy()
+        rates = [np.frombuffer(series_rates, dtype=float).copy() for series_rates in self._rates]
+        if self.trials and (not len(checkpoints) or checkpoints[-1] != self.trials):
+            checkpoints = np.append(checkpoints, self.trials)
+            rates = [np.append(series_rates, rate) for series_rates, rate in zip(rates, self.rates)]
+        return (checkpoints, *rates)
+
+    def __len__(self):
+        return len(self._checkpoints)
@@ -1,4 +1,26 @@
+import math
 import random
+import time
+from fractions import Fraction
+from math import comb
+from statistics import NormalDist
+from typing import NamedTuple
+
+import numpy as np
+
+# Version of the simulation engines; bump it whenever their results change
+# so that cached results are recomputed.
+ENGINE_VERSION = 1
+
+# Number of games simulated per vectorized chunk; bounds the memory used
+# by `simulate_game_vectorized` regardless of the number of trials.
+CHUNK_SIZE = 1_000_000
+
+# Host behaviours supported by the generalized engine: the classic host
+# knows where the cars are and only opens goat doors, the ignorant host
+# opens doors at random (games where a car is revealed are discarded).
+KNOWING_HOST = "knowing"
+IGNORANT_HOST = "ignorant"
 
 def monty_hall_game(switch_doors):
     """
@@ -50,11 +72,261 @@ def simulate_game(trials):
     return num_wins_without_switching / trials, num_wins_with_switching / trials
 
 
+def play_games(trials, rng, common_random_numbers=True):
+    """
+    Plays a batch of Monty Hall games with integer arrays instead of strings.
+
+    Doors are numbered 0-2. The car position and the initial pick are drawn
+    for every game at once; the host reveal and the door reached by
+    switching follow from them arithmetically (the three door numbers sum
+    to 3).
+
+    Args:
+        trials (int): The number of games to play.
+        rng (numpy.random.Generator): The random generator to use.
+        common_random_numbers (bool): Evaluate both strategies on the same
+            sampled games, which reduces the variance of their difference.
+            Otherwise each strategy gets its own independent games.
+
+    Returns:
+        tuple: Two boolean arrays telling which games were won without
+        switching and with switching.
+    """
+    def play(n):
+        car = rng.integers(0, 3, size=n, dtype=np.int8)
+        initial_choice = rng.integers(0, 3, size=n, dtype=np.int8)
+        picked_car = initial_choice == car
+        # If the player picked the car the host opens one of the two other
+        # doors at random, otherwise the only door that is neither pick nor car
+        random_other = (initial_choice + 1 + rng.integers(0, 2, size=n, dtype=np.int8)) % 3
+        door_revealed = np.where(picked_car, random_other, 3 - initial_choice - car)
+        switched_choice = 3 - initial_choice - door_revealed
+        return picked_car, switched_choice == car
+
+    if common_random_numbers:
+        return play(trials)
+    wins_without_switching, _ = play(trials)
+    _, wins_with_switching = play(trials)
+    return wins_without_switching, wins_with_switching
+
+
+def simulate_game_vectorized(trials, seed=None, common_random_numbers=True, chunk_size=CHUNK_SIZE):
+    """
+    Simulates the Monty Hall game for a given number of trials with NumPy.
+
+    Produces the same estimates as `simulate_game`, but plays the games in
+    vectorized chunks with `play_games`.
+
+    Args:
+        trials (int): The number of times to simulate the game.
+        seed (int, optional): Seed for the NumPy random generator.
+        common_random_numbers (bool): Evaluate both strategies on the same games.
+        chunk_size (int): The number of games played per chunk.
+
+    Returns:
+        tuple: A tuple containing the winning percentage without switching and with switching.
+    """
+    rng = np.random.default_rng(seed)
+    num_wins_without_switching = 0
+    num_wins_with_switching = 0
+    remaining = trials
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        wins_without_switching, wins_with_switching = play_games(n, rng, common_random_numbers)
+        num_wins_without_switching += int(np.count_nonzero(wins_without_switching))
+        num_wins_with_switching += int(np.count_nonzero(wins_with_switching))
+        remaining -= n
+    return num_wins_without_switching / trials, num_wins_with_switching / trials
+
+
+def _check_variant(doors, cars, revealed, host):
+    """Validates the parameters of a generalized Monty Hall game."""
+    if host not in (KNOWING_HOST, IGNORANT_HOST):
+        raise ValueError(f"Unknown host: {host!r}")
+    if not 1 <= cars < doors:
+        raise ValueError("There must be at least one car and one goat")
+    # The host needs enough goats among the doors the player did not pick,
+    # and at least one closed door must remain to switch to
+    if not 0 <= revealed <= doors - cars - 1:
+        raise ValueError("The host cannot reveal that many goats")
+
+
+def simulate_variant(trials, doors=3, cars=1, revealed=1, host=KNOWING_HOST, seed=None, chunk_size=CHUNK_SIZE):
+    """
+    Simulates a generalized Monty Hall game with N doors, several cars and K reveals.
+
+    Doors are interchangeable, so a game is represented by integer counts
+    rather than a list of doors: whether the initial pick hides a car, how
+    many cars the host uncovers, and which of the remaining closed doors
+    the switching player lands on. The cost per game does not depend on
+    the number of doors.
+
+    Args:
+        trials (int): The number of times to simulate the game.
+        doors (int): The number of doors.
+        cars (int): The number of doors hiding a car.
+        revealed (int): The number of doors the host opens.
+        host (str): `KNOWING_HOST` only opens goat doors; `IGNORANT_HOST`
+            opens random doors, and games where a car shows up are discarded.
+        seed (int, optional): Seed for the NumPy random generator.
+        chunk_size (int): The number of games played per chunk.
+
+    Returns:
+        tuple: A tuple containing the winning percentage without switching and with switching.
+
+    Raises:
+        ValueError: If no game is left to count, e.g. when the ignorant host
+            reveals a car in every one of the trials.
+    """
+    _check_variant(doors, cars, revealed, host)
+    rng = np.random.default_rng(seed)
+    closed_doors = doors - 1 - revealed
+    num_games = 0
+    num_wins_without_switching = 0
+    num_wins_with_switching = 0
+    remaining = trials
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        # The initial pick is a uniform door; cars occupy doors 0..cars-1
+        picked_car = rng.integers(0, doors, size=n) < cars
+        cars_left = cars - picked_car
+        if host == IGNORANT_HOST:
+            # Count the cars among the doors opened at random
+            cars_revealed = rng.hypergeometric(cars_left, doors - 1 - cars_left, revealed)
+            valid = cars_revealed == 0
+            picked_car, cars_left = picked_car[valid], cars_left[valid]
+        # The switching player picks one of the remaining closed doors at random
+        switch_wins = rng.integers(0, closed_doors, size=len(cars_left)) < cars_left
+        num_games += len(cars_left)
+        num_wins_without_switching += int(np.count_nonzero(picked_car))
+        num_wins_with_switching += int(np.count_nonzero(switch_wins))
+        remaining -= n
+    if num_games == 0:
+        raise ValueError(f"No valid games left out of {trials} trials")
+    return num_wins_without_switching / num_games, num_wins_with_switching / num_games
+
+
+def variant_probability(doors=3, cars=1, revealed=1, host=KNOWING_HOST):
+    """
+    Computes the exact winning probabilities of a generalized Monty Hall game.
+
+    Args:
+        doors (int): The number of doors.
+        cars (int): The number of doors hiding a car.
+        revealed (int): The number of doors the host opens.
+        host (str): `KNOWING_HOST` or `IGNORANT_HOST` (conditioned on no car
+            being revealed).
+
+    Returns:
+        tuple: Exact fractions of the winning probability without switching and with switching.
+    """
+    _check_variant(doors, cars, revealed, host)
+    closed_doors = doors - 1 - revealed
+    # Weight of the games where the initial pick is a car / a goat
+    picked_car = Fraction(cars, doors)
+    picked_goat = Fraction(doors - cars, doors)
+    if host == IGNORANT_HOST:
+        # Condition on the host opening only goats (the common comb(doors - 1,
+        # revealed) denominator cancels out)
+        picked_car *= comb(doors - cars, revealed)
+        picked_goat *= comb(doors - cars - 1, revealed)
+    total = picked_car + picked_goat
+    stay = picked_car / total
+    switch = (picked_car * (cars - 1) + picked_goat * cars) / (total * closed_doors)
+    return stay, switch
+
+
+class AdaptiveResult(NamedTuple):
+    """Estimate of one strategy returned by `simulate_game_adaptive`."""
+
+    win_percentage: float
+    trials: int
+    ci_low: float
+    ci_high: float
+
+
+def wilson_interval(wins, trials, confidence=0.95):
+    """
+    Computes the Wilson score confidence interval of a winning percentage.
+
+    Args:
+        wins (int): The number of games won.
+        trials (int): The number of games played.
+        confidence (float): The confidence level of the interval.
+
+    Returns:
+        tuple: The lower and upper bound of the interval.
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = wins / trials
+    denominator = 1 + z**2 / trials
+    center = (p + z**2 / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z**2 / (4 * trials**2)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def simulate_game_adaptive(
+    target_half_width=0.005,
+    confidence=0.95,
+    batch_size=10_000,
+    max_trials=None,
+    time_budget=None,
+    seed=None,
+):
+    """
+    Simulates the Monty Hall game until both estimates are precise enough.
+
+    Games run in vectorized batches. After every batch the Wilson confidence interval of
+    both strategies is updated, and the simulation stops once both
+    half-widths reach `target_half_width`, or when `max_trials` or the
+    `time_budget` is exhausted.
+
+    Args:
+        target_half_width (float): The wanted half-width of the confidence intervals.
+        confidence (float): The confidence level of the intervals.
+        batch_size (int): The number of games per strategy between two checks.
+        max_trials (int, optional): Hard limit on the number of games per strategy.
+        time_budget (float, optional): Hard limit on the run time, in seconds.
+        seed (int, optional): Seed for the NumPy random generator.
+
+    Returns:
+        tuple: An AdaptiveResult without switching and one with switching.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    if max_trials is not None and max_trials < 1:
+        raise ValueError(f"max_trials must be at least 1, got {max_trials}")
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    num_wins_without_switching = 0
+    num_wins_with_switching = 0
+    trials = 0
+    while True:
+        n = batch_size if max_trials is None else min(batch_size, max_trials - trials)
+        wins_without_switching, wins_with_switching = play_games(n, rng)
+        num_wins_without_switching += int(np.count_nonzero(wins_without_switching))
+        num_wins_with_switching += int(np.count_nonzero(wins_with_switching))
+        trials += n
+        ci_no_switch = wilson_interval(num_wins_without_switching, trials, confidence)
+        ci_switch = wilson_interval(num_wins_with_switching, trials, confidence)
+        half_width = max(ci_no_switch[1] - ci_no_switch[0], ci_switch[1] - ci_switch[0]) / 2
+        if half_width <= target_half_width:
+            break
+        if max_trials is not None and trials >= max_trials:
+            break
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            break
+    return (
+        AdaptiveResult(num_wins_without_switching / trials, trials, *ci_no_switch),
+        AdaptiveResult(num_wins_with_switching / trials, trials, *ci_switch),
+    )
+
+
 if __name__ == "__main__":
     # Number of trials to simulate
-    trials = 10000
+    trials = 1_000_000
     # Simulate the game and get the winning percentages
-    win_percentage_no_switch, win_percentage_switch = simulate_game(trials)
+    win_percentage_no_switch, win_percentage_switch = simulate_game_vectorized(trials)
     # Print the results
     print(f"Winning percentage without switching doors: {(win_percentage_no_switch):.2%}")
     print(f"Winning percentage with    switching doors: {(win_percentage_switch):.2%}")
\ No newline at end of file
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from monty_hall import IGNORANT_HOST, simulate_variant  # noqa: E402
+
+
+def test_ignorant_host_discarding_every_game_raises():
+    with pytest.raises(ValueError, match="No valid games"):
+        simulate_variant(1, host=IGNORANT_HOST, seed=2)
+
+
+def test_ignorant_host_keeps_valid_games():
+    stay, switch = simulate_variant(20_000, host=IGNORANT_HOST, seed=0)
+    assert stay == pytest.approx(0.5, abs=0.02)
+    assert switch == pytest.approx(0.5, abs=0.02)
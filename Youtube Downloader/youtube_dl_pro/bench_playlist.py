@@ -0,0 +1,212 @@
+"""
+Benchmark of parallel playlist downloads against a local stand-in server.
+
+Starts an HTTP server on 127.0.0.1 that serves an RSS playlist of fake
+media files, each sent at a limited bandwidth per connection like a real
+video host, then downloads the playlist with several values of --jobs
+and reports the throughput of each run. Some videos can be made to fail
+(HTTP 404) to check that the other downloads go on and that failures
+are reported per video. No network access is needed.
+
+Usage (from the youtube_dl_pro directory):
+
+    python bench_playlist.py
+    python bench_playlist.py --videos 16 --size 2000000 --jobs 1 2 4 8 --host-rate 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+
+from src.downloader import DownloadConfig, YouTubeDownloader, console
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FakeMediaServer(ThreadingHTTPServer):
+    """Serves `/playlist.rss` and the `/media/video-N.mp4` files it lists."""
+
+    daemon_threads = True
+
+    def __init__(self, videos: int, size: int, bandwidth: float, latency: float, failures: int):
+        super().__init__(("127.0.0.1", 0), _FakeMediaHandler)
+        self.videos = videos
+        self.size = size
+        self.bandwidth = bandwidth  # Bytes per second per connection
+        self.latency = latency  # Seconds before each response
+        self.failing = (
+            set(range(1, videos + 1)[:: max(1, videos // failures)][:failures])
+            if failures
+            else set()
+        )
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+
+class _FakeMediaHandler(BaseHTTPRequestHandler):
+    server: FakeMediaServer
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send_headers(self, content_type: str, length: int) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        server = self.server
+        server.count_request()
+        time.sleep(server.latency)
+        if self.path == "/playlist.rss":
+            items = "".join(
+                f"<item><title>Video {i:03d}</title><guid>video-{i}</guid>"
+                f"<link>{server.url}/media/video-{i}.mp4</link></item>"
+                for i in range(1, server.videos + 1)
+            )
+            body = (
+                '<?xml version="1.0"?><rss version="2.0"><channel><title>Benchmark playlist</title>'
+                f"<link>{server.url}/</link>{items}</channel></rss>"
+            ).encode()
+            self._send_headers("application/rss+xml", len(body))
+            self.wfile.write(body)
+            return
+
+        try:
+            number = int(self.path.rsplit("-", 1)[1].split(".", 1)[0])
+        except (IndexError, ValueError):
+            number = 0
+        if (
+            not self.path.startswith("/media/")
+            or not 1 <= number <= server.videos
+            or number in server.failing
+        ):
+            self.send_error(404)
+            return
+        self._send_headers("video/mp4", server.size)
+        if self.command == "HEAD":
+            return
+        chunk = b"\0" * CHUNK_SIZE
+        start = time.perf_counter()
+        sent = 0
+        try:
+            while sent < server.size:
+                size = min(CHUNK_SIZE, server.size - sent)
+                self.wfile.write(chunk[:size])
+                sent += size
+                # Throttle to the bandwidth of one connection
+                delay = sent / server.bandwidth - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+        except ConnectionError:
+            # yt-dlp probes the media URL and closes the connection early
+            self.close_connection = True
+
+    do_HEAD = do_GET
+
+
+def run(
+    videos: int,
+    size: int,
+    bandwidth: float,
+    latency: float,
+    failures: int,
+    jobs_list: List[int],
+    host_rate: float,
+) -> None:
+    server = FakeMediaServer(videos, size, bandwidth, latency, failures)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    console.print(
+        f"[bold cyan]Fake media server:[/] {server.url}, {videos} videos of {size / 1e6:.1f} MB "
+        f"at {bandwidth / 1e6:.1f} MB/s per connection, {failures} failing"
+    )
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for jobs in jobs_list:
+                config = DownloadConfig(
+                    output_path=Path(directory) / f"jobs-{jobs}", jobs=jobs, host_rate=host_rate
+                )
+                downloader = YouTubeDownloader(config)
+                playlist = downloader.fetch_playlist(f"{server.url}/playlist.rss")
+                server.requests = 0
+                result = downloader.download_entries(playlist)
+                rows.append((jobs, result, server.requests))
+    finally:
+        server.shutdown()
+
+    console.print(
+        f"\n{'jobs':>5} {'videos/s':>9} {'MB/s':>7} {'speedup':>8} "
+        f"{'ok':>4} {'failed':>7} {'requests':>9}"
+    )
+    base = rows[0][1].seconds if rows else 0
+    for jobs, result, requests in rows:
+        console.print(
+            f"{jobs:>5} {len(result.items) / result.seconds:>9.2f} "
+            f"{result.total_size / result.seconds / 1e6:>7.2f} {base / result.seconds:>7.1f}x "
+            f"{len(result.succeeded):>4} {len(result.failed):>7} {requests:>9}"
+        )
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Parallel playlist download benchmark against a local server"
+    )
+    parser.add_argument(
+        "--videos", type=int, default=16, help="Videos in the playlist (default: 16)"
+    )
+    parser.add_argument(
+        "--size", type=int, default=1_000_000, help="Bytes per video (default: 1000000)"
+    )
+    parser.add_argument(
+        "--bandwidth",
+        type=float,
+        default=2_000_000,
+        help="Bytes per second per connection (default: 2000000)",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Seconds before each response (default: 0.05)"
+    )
+    parser.add_argument("--failures", type=int, default=1, help="Videos answering 404 (default: 1)")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="Values of --jobs (default: 1 2 4 8)",
+    )
+    parser.add_argument(
+        "--host-rate",
+        type=float,
+        default=0.0,
+        help="Requests per second per host, 0 for no limit (default: 0)",
+    )
+    args = parser.parse_args(argv)
+    run(
+        args.videos,
+        args.size,
+        args.bandwidth,
+        args.latency,
+        args.failures,
+        args.jobs,
+        args.host_rate,
+    )
+
+
+if __name__ == "__main__":
+    main()
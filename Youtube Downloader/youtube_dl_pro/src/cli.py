@@ -1,6 +1,7 @@
 """
 Command-line interface for YouTube Downloader Pro.
 """
+
 from pathlib import Path
 from typing import Optional
 
@@ -17,6 +18,7 @@ app = typer.Typer(
 )
 console = Console()
 
+
 def display_header():
     """Display application header."""
     console.print(
@@ -27,33 +29,55 @@ def display_header():
         )
     )
 
+
 def validate_url(url: str) -> bool:
     """Basic URL validation."""
-    return any(domain in url for domain in ["youtube.com/watch?v=", "youtu.be/"])
+    return any(
+        domain in url
+        for domain in ["youtube.com/watch?v=", "youtube.com/playlist?list=", "youtu.be/"]
+    )
+
 
 @app.command()
 def download(
     url: str = typer.Argument(..., help="YouTube video or playlist URL"),
     format: VideoFormat = typer.Option(
         VideoFormat.MP4,
-        "--format", "-f",
+        "--format",
+        "-f",
         help="Output format (mp4 or mp3)",
     ),
     quality: VideoQuality = typer.Option(
         VideoQuality.HIGHEST,
-        "--quality", "-q",
+        "--quality",
+        "-q",
         help="Video quality (144p to 1080p, or 'highest'/'lowest')",
     ),
     output: Path = typer.Option(
         Path("downloads"),
-        "--output", "-o",
+        "--output",
+        "-o",
         help="Output directory for downloaded files",
     ),
     skip_existing: bool = typer.Option(
         False,
-        "--skip-existing", "-s",
+        "--skip-existing",
+        "-s",
         help="Skip downloading if file already exists",
     ),
+    jobs: int = typer.Option(
+        1,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of playlist videos downloaded in parallel",
+    ),
+    host_rate: float = typer.Option(
+        0.0,
+        "--host-rate",
+        min=0.0,
+        help="Maximum requests per second to each host (0 for no limit)",
+    ),
 ):
     """Download a video or playlist from YouTube."""
     display_header()
@@ -67,6 +91,8 @@ def download(
         format=format,
         quality=quality,
         skip_existing=skip_existing,
+        jobs=jobs,
+        host_rate=host_rate,
     )
 
     downloader = YouTubeDownloader(config)
@@ -76,12 +102,15 @@ def download(
     else:
         downloader.download_video(url)
 
+
 @app.command()
 def version():
     """Display version information."""
     from src import __version__
+
     console.print(f"YouTube Downloader Pro v{__version__}")
 
+
 def main():
     """Main entry point."""
-    app()
\ No newline at end of file
+    app()
@@ -1,38 +1,48 @@
 """
 Core functionality for downloading YouTube videos and playlists using yt-dlp.
 """
+
 from __future__ import annotations
 
-import os
 import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
 
 import yt_dlp
 from pydantic import BaseModel
 from rich.console import Console
+from rich.markup import escape
 from rich.progress import (
+    BarColumn,
+    DownloadColumn,
     Progress,
     SpinnerColumn,
-    TextColumn,
-    BarColumn,
     TaskProgressColumn,
+    TextColumn,
     TimeRemainingColumn,
     TransferSpeedColumn,
-    DownloadColumn,
 )
 
 console = Console()
 
+
 class VideoFormat(str, Enum):
     """Supported video formats."""
+
     MP4 = "mp4"
     MP3 = "mp3"
 
+
 class VideoQuality(str, Enum):
     """Supported video qualities."""
+
     HIGHEST = "highest"
     LOWEST = "lowest"
     Q144P = "144p"
@@ -42,12 +52,118 @@ class VideoQuality(str, Enum):
     Q720P = "720p"
     Q1080P = "1080p"
 
+
 class DownloadConfig(BaseModel):
     """Configuration for video download."""
+
     output_path: Path = Path("downloads")
     format: VideoFormat = VideoFormat.MP4
     quality: VideoQuality = VideoQuality.HIGHEST
     skip_existing: bool = False
+    jobs: int = 1  # Playlist videos downloaded in parallel
+    host_rate: float = 0.0  # Requests per second to each host, 0 for no limit
+
+
+class HostRateLimiter:
+    """Thread-safe token bucket per host.
+
+    Allows `rate` requests per second to each host, with bursts of up to
+    `burst` requests. A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate: float = 0.0, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, tuple] = {}  # host -> (tokens, time of the last update)
+
+    def acquire(self, url: str) -> float:
+        """Wait until a request to the host of `url` is allowed, return the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+            # Take the token now (possibly going negative) so that
+            # concurrent callers queue up behind this one
+            self._buckets[host] = (tokens - 1, now)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class ItemResult(BaseModel):
+    """Outcome of the download of one playlist video."""
+
+    index: int
+    title: str
+    url: str
+    success: bool
+    error: Optional[str] = None
+    filepath: Optional[str] = None
+    size: int = 0  # Bytes downloaded
+    seconds: float = 0.0
+
+
+class PlaylistResult(BaseModel):
+    """Per-video outcomes of a playlist download, in playlist order."""
+
+    title: str
+    items: List[ItemResult] = []
+    seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> List[ItemResult]:
+        return [item for item in self.items if item.success]
+
+    @property
+    def failed(self) -> List[ItemResult]:
+        return [item for item in self.items if not item.success]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    @property
+    def total_size(self) -> int:
+        return sum(item.size for item in self.items)
+
+
+class _RateLimitedYoutubeDL(yt_dlp.YoutubeDL):
+    """YoutubeDL whose HTTP requests (extraction and downloads) go through a `HostRateLimiter`."""
+
+    def __init__(self, params: dict, limiter: HostRateLimiter):
+        super().__init__(params)
+        self._limiter = limiter
+
+    def urlopen(self, req):
+        if isinstance(req, str):
+            url = req
+        else:
+            # yt_dlp.networking.Request, or urllib.request.Request in older versions
+            url = req.url if isinstance(getattr(req, "url", None), str) else req.get_full_url()
+        self._limiter.acquire(url)
+        return super().urlopen(req)
+
+
+class _SilentLogger:
+    """yt-dlp logger for parallel downloads: errors are reported in the results instead."""
+
+    def debug(self, msg: str) -> None:
+        pass
+
+    def info(self, msg: str) -> None:
+        pass
+
+    def warning(self, msg: str) -> None:
+        pass
+
+    def error(self, msg: str) -> None:
+        pass
+
 
 class YouTubeDownloader:
     """Main downloader class for YouTube videos and playlists."""
@@ -56,12 +172,18 @@ class YouTubeDownloader:
         """Initialize downloader with configuration."""
         self.config = config or DownloadConfig()
         self.config.output_path.mkdir(parents=True, exist_ok=True)
+        # Shared by all the YoutubeDL instances, so parallel downloads share the limit
+        self._rate_limiter = HostRateLimiter(self.config.host_rate)
+
+    def _ydl(self, opts: dict) -> yt_dlp.YoutubeDL:
+        """Create a YoutubeDL instance that respects the per-host rate limit."""
+        return _RateLimitedYoutubeDL(opts, self._rate_limiter)
 
     def _get_format(self) -> str:
         """Get the format string based on configuration."""
         if self.config.format == VideoFormat.MP3:
             return "bestaudio[ext=m4a]/bestaudio/best"
-        
+
         if self.config.quality == VideoQuality.HIGHEST:
             return "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best"
         elif self.config.quality == VideoQuality.LOWEST:
@@ -69,9 +191,11 @@ class YouTubeDownloader:
         else:
             # More specific format selection for better performance
             height = self.config.quality.value[:-1]  # Remove 'p' from quality
-            return (f"bestvideo[height<={height}][ext=mp4]+bestaudio[ext=m4a]/"
-                   f"best[height<={height}][ext=mp4]/"
-                   f"best[height<={height}]")
+            return (
+                f"bestvideo[height<={height}][ext=mp4]+bestaudio[ext=m4a]/"
+                f"best[height<={height}][ext=mp4]/"
+                f"best[height<={height}]"
+            )
 
     def _get_output_template(self, is_playlist: bool = False) -> str:
         """Get the output template for yt-dlp."""
@@ -85,30 +209,35 @@ class YouTubeDownloader:
         output_template = self._get_output_template(is_playlist)
 
         ydl_opts = {
-            'format': format_str,
-            'outtmpl': output_template,
-            'quiet': True,
-            'no_warnings': True,
-            'progress_hooks': [self._progress_hook],
-            'concurrent_fragments': 3,  # Download fragments concurrently
-            'retries': 10,  # Retry on error
-            'file_access_retries': 5,
-            'fragment_retries': 10,
-            'retry_sleep': lambda n: 5 * (n + 1),  # Exponential backoff
-            'socket_timeout': 30,
+            "format": format_str,
+            "outtmpl": output_template,
+            "quiet": True,
+            "no_warnings": True,
+            "progress_hooks": [self._progress_hook],
+            "concurrent_fragments": 3,  # Download fragments concurrently
+            "retries": 10,  # Retry on error
+            "file_access_retries": 5,
+            "fragment_retries": 10,
+            "retry_sleep": lambda n: 5 * (n + 1),  # Exponential backoff
+            "socket_timeout": 30,
         }
 
         if self.config.format == VideoFormat.MP3:
-            ydl_opts.update({
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }],
-                'postprocessor_args': [
-                    '-threads', '4',  # Use 4 threads for conversion
-                ],
-            })
+            ydl_opts.update(
+                {
+                    "postprocessors": [
+                        {
+                            "key": "FFmpegExtractAudio",
+                            "preferredcodec": "mp3",
+                            "preferredquality": "192",
+                        }
+                    ],
+                    "postprocessor_args": [
+                        "-threads",
+                        "4",  # Use 4 threads for conversion
+                    ],
+                }
+            )
 
         return ydl_opts
 
@@ -131,39 +260,40 @@ class YouTubeDownloader:
 
     def _progress_hook(self, d: dict):
         """Progress hook for yt-dlp."""
-        if not hasattr(self, '_progress'):
+        if not hasattr(self, "_progress"):
             self._progress = self._create_progress()
             self._task_id = None
 
-        if d['status'] == 'downloading':
-            total = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
-            downloaded = d.get('downloaded_bytes', 0)
-            speed = d.get('speed', 0)
+        if d["status"] == "downloading":
+            total = d.get("total_bytes") or d.get("total_bytes_estimate", 0)
+            downloaded = d.get("downloaded_bytes", 0)
+            speed = d.get("speed", 0)
             if total > 0:
                 if self._task_id is None:
                     with self._progress:
+                        title = d.get("info_dict", {}).get("title", "video")
                         self._task_id = self._progress.add_task(
-                            description=f"Downloading {d.get('info_dict', {}).get('title', 'video')}",
+                            description=f"Downloading {title}",
                             total=total,
                         )
 
-                if hasattr(self, '_progress'):
+                if hasattr(self, "_progress"):
                     self._progress.update(
                         self._task_id,
                         completed=downloaded,
                         refresh=True,
                     )
 
-        elif d['status'] == 'finished':
-            if hasattr(self, '_progress'):
+        elif d["status"] == "finished":
+            if hasattr(self, "_progress"):
                 self._progress.stop()
-                delattr(self, '_progress')
+                delattr(self, "_progress")
                 self._task_id = None
             console.print("\n[bold green]Download completed.[/] Processing...")
 
     def _format_size(self, bytes: int) -> str:
         """Format bytes to human readable size."""
-        for unit in ['B', 'KB', 'MB', 'GB']:
+        for unit in ["B", "KB", "MB", "GB"]:
             if bytes < 1024:
                 return f"{bytes:.1f}{unit}"
             bytes /= 1024
@@ -173,28 +303,30 @@ class YouTubeDownloader:
         """Download a single video."""
         try:
             console.print(f"[bold cyan]Fetching video information...[/]")
-            
+
             opts = self._get_ydl_opts()
-            opts['verbose'] = True  # Enable verbose output
-            
-            with yt_dlp.YoutubeDL(opts) as ydl:
+            opts["verbose"] = True  # Enable verbose output
+
+            with self._ydl(opts) as ydl:
                 try:
                     console.print("[bold cyan]Extracting video information...[/]")
-                    info = ydl.extract_info(url, download=True)  # Changed to True to download directly
-                    
+                    info = ydl.extract_info(
+                        url, download=True
+                    )  # Changed to True to download directly
+
                     if not info:
                         console.print("[bold red]Error:[/] Could not fetch video information")
                         return False
-                    
+
                     console.print(f"[bold green]Download completed successfully![/]")
                     console.print(f"[bold cyan]Title:[/] {info.get('title', 'Unknown')}")
                     console.print(f"[bold cyan]Format:[/] {self.config.format.value.upper()}")
                     return True
-                        
+
                 except Exception as e:
                     console.print(f"[bold red]Download error:[/] {str(e)}")
                     return False
-                    
+
         except Exception as e:
             console.print(f"[bold red]Error:[/] {str(e)}")
             return False
@@ -203,25 +335,144 @@ class YouTubeDownloader:
             console.print(f"[bold red]Error downloading video:[/] {str(e)}")
             return False
 
+    def fetch_playlist(self, url: str) -> Optional[Dict[str, Any]]:
+        """Fetch the list of videos of a playlist, without resolving each video.
+
+        Returns the playlist info with its `entries` as a list, or None if
+        `url` is not a playlist.
+        """
+        opts = self._get_ydl_opts(is_playlist=True)
+        # One request per page of the playlist instead of one per video;
+        # each video is resolved later by the worker that downloads it
+        opts["extract_flat"] = "in_playlist"
+        with self._ydl(opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+        if not info or "entries" not in info:
+            return None
+        # Unavailable videos come back as None
+        info["entries"] = [entry for entry in info["entries"] if entry]
+        return info
+
+    def _playlist_fields(self, playlist: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """Playlist fields yt-dlp adds to each entry, used by the output template."""
+        count = len(playlist["entries"])
+        title = playlist.get("title") or playlist.get("id")
+        return {
+            "playlist": title,
+            "playlist_id": playlist.get("id"),
+            "playlist_title": title,
+            "playlist_index": index,
+            "playlist_autonumber": index,
+            "playlist_count": count,
+            "n_entries": count,
+        }
+
+    def _download_entry(
+        self, playlist: Dict[str, Any], index: int, entry: Dict[str, Any], progress: Progress
+    ) -> ItemResult:
+        """Download one playlist entry with its own YoutubeDL instance (run in a worker thread)."""
+        title = entry.get("title") or entry.get("id") or f"Video {index}"
+        url = entry.get("webpage_url") or entry.get("url") or ""
+        task_id = progress.add_task(description=title, total=None)
+        size = 0
+
+        def hook(d: dict):
+            nonlocal size
+            if d["status"] in ("downloading", "finished"):
+                size = d.get("downloaded_bytes") or d.get("total_bytes") or size
+                total = d.get("total_bytes") or d.get("total_bytes_estimate")
+                progress.update(task_id, total=total, completed=size)
+
+        opts = self._get_ydl_opts(is_playlist=True)
+        opts.update({"progress_hooks": [hook], "noprogress": True, "logger": _SilentLogger()})
+        start = time.perf_counter()
+        try:
+            with self._ydl(opts) as ydl:
+                # Reuses the entry fetched with the playlist: only this video is resolved
+                info = ydl.process_ie_result(
+                    dict(entry), download=True, extra_info=self._playlist_fields(playlist, index)
+                )
+            downloads = (info or {}).get("requested_downloads") or [{}]
+            return ItemResult(
+                index=index,
+                title=(info or {}).get("title") or title,
+                url=url,
+                success=True,
+                filepath=downloads[0].get("filepath"),
+                size=size,
+                seconds=time.perf_counter() - start,
+            )
+        except Exception as e:
+            # yt-dlp errors start with "ERROR: ", which the report already says
+            error = str(e).replace("ERROR: ", "", 1)
+            return ItemResult(
+                index=index,
+                title=title,
+                url=url,
+                success=False,
+                error=error,
+                size=size,
+                seconds=time.perf_counter() - start,
+            )
+        finally:
+            progress.remove_task(task_id)
+
+    def download_entries(self, playlist: Dict[str, Any]) -> PlaylistResult:
+        """Download the entries of a fetched playlist, `config.jobs` at a time.
+
+        A failed video does not stop the others; every outcome is
+        recorded in the result.
+        """
+        entries = playlist["entries"]
+        result = PlaylistResult(title=playlist.get("title") or playlist.get("id") or "Playlist")
+        start = time.perf_counter()
+        progress = self._create_progress()
+        with progress, ThreadPoolExecutor(max_workers=max(1, self.config.jobs)) as pool:
+            futures = [
+                pool.submit(self._download_entry, playlist, index, entry, progress)
+                for index, entry in enumerate(entries, 1)
+            ]
+            for future in as_completed(futures):
+                item = future.result()
+                result.items.append(item)
+                if item.success:
+                    progress.console.print(f"[green]✓[/] {escape(item.title)}")
+                else:
+                    progress.console.print(
+                        f"[red]✗[/] {escape(item.title)}: {escape(item.error or '')}"
+                    )
+        result.items.sort(key=lambda item: item.index)
+        result.seconds = time.perf_counter() - start
+        return result
+
     def download_playlist(self, url: str) -> bool:
-        """Download all videos from a playlist."""
+        """Download all videos from a playlist, `config.jobs` at a time."""
         try:
             console.print(f"[bold cyan]Fetching playlist information...[/]")
-            
-            with yt_dlp.YoutubeDL(self._get_ydl_opts(is_playlist=True)) as ydl:
-                info = ydl.extract_info(url, download=False)
-                if 'entries' not in info:
-                    console.print("[bold red]Error:[/] Not a valid playlist URL")
-                    return False
+            playlist = self.fetch_playlist(url)
+            if playlist is None:
+                console.print("[bold red]Error:[/] Not a valid playlist URL")
+                return False
 
-                console.print(f"[bold cyan]Playlist Title:[/] {info.get('title', 'Unknown')}")
-                console.print(f"[bold cyan]Number of videos:[/] {len(info['entries'])}")
-                
-                console.print(f"[bold green]Starting downloads...[/]")
-                ydl.download([url])
-                console.print(f"\n[bold green]Successfully downloaded playlist![/]")
-                return True
+            console.print(f"[bold cyan]Playlist Title:[/] {playlist.get('title', 'Unknown')}")
+            console.print(f"[bold cyan]Number of videos:[/] {len(playlist['entries'])}")
+
+            console.print(f"[bold green]Starting downloads ({self.config.jobs} at a time)...[/]")
+            result = self.download_entries(playlist)
+            rate = result.total_size / result.seconds if result.seconds else 0
+            console.print(
+                f"\n[bold green]Downloaded {len(result.succeeded)} "
+                f"of {len(result.items)} videos[/] "
+                f"({self._format_size(result.total_size)} in {result.seconds:.1f}s, "
+                f"{self._format_size(rate)}/s)"
+            )
+            for item in result.failed:
+                console.print(
+                    f"[bold red]Failed:[/] {item.index}. {escape(item.title)}: "
+                    f"{escape(item.error or '')}"
+                )
+            return result.ok
 
         except Exception as e:
             console.print(f"[bold red]Error downloading playlist:[/] {str(e)}")
-            return False
\ No newline at end of file
+            return False